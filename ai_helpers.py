@@ -1,5 +1,6 @@
 import streamlit as st
-import google.generativeai as genai
+import llm_client
+from core import summarize_text, SummaryError
 from prompts import SUMMARY_PROMPT, QUESTION_PROMPT
 
 def generate_gemini_summary(transcript_text):
@@ -13,11 +14,9 @@ def generate_gemini_summary(transcript_text):
         str: Generated summary
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-pro-exp")
-        response = model.generate_content(SUMMARY_PROMPT + transcript_text)
-        return response.text
-    except Exception as e:
-        st.error(f"Error generating summary: {str(e)}")
+        return summarize_text(transcript_text)
+    except SummaryError as e:
+        st.error(str(e))
         return "Unable to generate summary."
 
 def get_ai_response(question, summary):
@@ -32,10 +31,56 @@ def get_ai_response(question, summary):
         str: AI-generated response
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-pro-exp")
         formatted_prompt = QUESTION_PROMPT.format(summary=summary, question=question)
-        response = model.generate_content(formatted_prompt)
-        return response.text
+        return llm_client.generate(formatted_prompt, task=llm_client.TASK_CHAT)
+    except Exception as e:
+        st.error(f"Error generating response: {str(e)}")
+        return "Sorry, I couldn't generate a comprehensive response."
+
+def stream_generate(prompt, model_name=llm_client.GEMINI_MODEL, task=llm_client.TASK_CHAT):
+    """
+    Stream a Gemini response chunk by chunk through the shared client
+
+    Args:
+        prompt (str): Full prompt text
+        model_name (str): Gemini model to use
+        task (str): Kind of call, used to route automatic model selection
+
+    Yields:
+        str: Text fragments in the order they are generated
+    """
+    yield from llm_client.stream(prompt, model_name, task=task)
+
+def stream_gemini_summary(transcript_text):
+    """
+    Stream a summary as it is generated, for use with st.write_stream
+
+    Args:
+        transcript_text (str): Video transcript
+
+    Yields:
+        str: Summary text fragments
+    """
+    try:
+        yield from stream_generate(SUMMARY_PROMPT + transcript_text, task=llm_client.TASK_SUMMARY)
+    except Exception as e:
+        st.error(f"Error generating summary: {str(e)}")
+        yield "Unable to generate summary."
+
+def stream_ai_response(question, summary):
+    """
+    Stream an AI response as it is generated, for use with st.write_stream
+
+    Args:
+        question (str): User's question
+        summary (str): Video summary
+
+    Yields:
+        str: Response text fragments
+    """
+    try:
+        formatted_prompt = QUESTION_PROMPT.format(summary=summary, question=question)
+        yield from stream_generate(formatted_prompt)
     except Exception as e:
         st.error(f"Error generating response: {str(e)}")
-        return "Sorry, I couldn't generate a comprehensive response."
\ No newline at end of file
+        yield "Sorry, I couldn't generate a comprehensive response."
@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+
+# Cosine similarity above which a previously asked question counts as the same.
+# 0, the default, only matches identical normalized questions; fuzzy matches also
+# need the same content words, so negations, numbers and names never match
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0))
+ANSWER_CACHE_MAX_VIDEOS = int(os.getenv("ANSWER_CACHE_MAX_VIDEOS", 256))
+ANSWER_CACHE_MAX_PER_VIDEO = int(os.getenv("ANSWER_CACHE_MAX_PER_VIDEO", 200))
+
+# Dimension of the hashed feature vectors used for similarity
+VECTOR_DIMENSIONS = 2048
+# Vector rows allocated for a new video; the matrix doubles when full, up to the per-video cap
+INITIAL_ROWS = 8
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+# Words that only change the phrasing of a question, never what it asks
+_FUNCTION_WORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "do", "does", "did", "can", "could",
+    "would", "will", "please", "tell", "me", "us", "you", "what", "whats", "which", "about",
+}
+
+
+def normalize_question(question):
+    """
+    Normalize a question so trivially different phrasings share a key
+
+    Args:
+        question (str): User question
+
+    Returns:
+        str: Lowercased question without punctuation or extra whitespace
+    """
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", question.lower())).strip()
+
+
+def content_words(normalized):
+    """
+    Reduce a normalized question to the words that decide what it asks
+
+    Args:
+        normalized (str): Output of normalize_question()
+
+    Returns:
+        frozenset: Words other than articles, auxiliaries and politeness words
+    """
+    return frozenset(normalized.split()) - _FUNCTION_WORDS
+
+
+def embed_question(normalized):
+    """
+    Embed a normalized question as a unit vector of hashed word and character-trigram features
+
+    Args:
+        normalized (str): Output of normalize_question()
+
+    Returns:
+        numpy.ndarray: float32 vector of length VECTOR_DIMENSIONS
+    """
+    vector = np.zeros(VECTOR_DIMENSIONS, dtype=np.float32)
+    features = normalized.split()
+    padded = f" {normalized} "
+    features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    for feature in features:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        # The top bit picks a sign so colliding features tend to cancel out
+        vector[digest % VECTOR_DIMENSIONS] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    """
+    Per-video, per-language cache of chat answers with exact and similarity lookup
+    """
+
+    def __init__(self, threshold=ANSWER_CACHE_SIMILARITY, max_videos=ANSWER_CACHE_MAX_VIDEOS,
+                 max_per_video=ANSWER_CACHE_MAX_PER_VIDEO):
+        self.threshold = threshold
+        self.max_videos = max_videos
+        self.max_per_video = max_per_video
+        self._videos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_key, language, question):
+        """
+        Find a cached answer to the same or a near-identical question
+
+        Args:
+            video_key (str): Identifies the video and transcript language
+            language (str): Answer language
+            question (str): User question
+
+        Returns:
+            str or None: Cached answer
+        """
+        normalized = normalize_question(question)
+        with self._lock:
+            entry = self._videos.get((video_key, language))
+            answer = None
+            if entry is not None:
+                self._videos.move_to_end((video_key, language))
+                answer = entry["answers"].get(normalized)
+                if answer is None and self.threshold > 0 and entry["questions"]:
+                    # One matrix-vector product scores every earlier question; the
+                    # best match with the same content words wins
+                    scores = entry["vectors"][:len(entry["questions"])] @ embed_question(normalized)
+                    words = content_words(normalized)
+                    for best in np.argsort(-scores):
+                        if scores[best] < self.threshold:
+                            break
+                        candidate = entry["questions"][best]
+                        if content_words(candidate) == words:
+                            answer = entry["answers"][candidate]
+                            break
+        metrics.increment("cache_requests_total", cache="answer",
+                          result="miss" if answer is None else "hit")
+        return answer
+
+    def set(self, video_key, language, question, answer):
+        """
+        Store an answer
+
+        Args:
+            video_key (str): Identifies the video and transcript language
+            language (str): Answer language
+            question (str): User question
+            answer (str): Answer text
+        """
+        normalized = normalize_question(question)
+        if not normalized:
+            return
+        with self._lock:
+            entry = self._videos.get((video_key, language))
+            if entry is None:
+                entry = {
+                    "questions": [],
+                    "answers": {},
+                    "vectors": np.zeros((min(INITIAL_ROWS, self.max_per_video), VECTOR_DIMENSIONS),
+                                        dtype=np.float32),
+                }
+                self._videos[(video_key, language)] = entry
+                while len(self._videos) > self.max_videos:
+                    self._videos.popitem(last=False)
+            self._videos.move_to_end((video_key, language))
+
+            if normalized in entry["answers"]:
+                entry["answers"][normalized] = answer
+                return
+            if len(entry["questions"]) >= self.max_per_video:
+                # Drop the oldest question and shift its vector out
+                oldest = entry["questions"].pop(0)
+                del entry["answers"][oldest]
+                entry["vectors"][:-1] = entry["vectors"][1:].copy()
+            elif len(entry["questions"]) == len(entry["vectors"]):
+                grown = np.zeros((min(2 * len(entry["vectors"]), self.max_per_video), VECTOR_DIMENSIONS),
+                                 dtype=np.float32)
+                grown[:len(entry["vectors"])] = entry["vectors"]
+                entry["vectors"] = grown
+            entry["vectors"][len(entry["questions"])] = embed_question(normalized)
+            entry["questions"].append(normalized)
+            entry["answers"][normalized] = answer
+
+
+# Shared by every session in the process
+answer_cache = AnswerCache()
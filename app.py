@@ -1,15 +1,26 @@
 import streamlit as st
 from dotenv import load_dotenv
-import os
-import google.generativeai as genai
-from youtube_transcript_api import YouTubeTranscriptApi
-from urllib.parse import urlparse, parse_qs
-from googletrans import Translator
-import time
-
-# Load environment variables
+from summary_cache import make_cache_key, make_variant_key, get_cached_summary
+from ai_helpers import stream_generate
+from transcripts import (
+    prefetch_transcript, cached_resolution, describe_track, SOURCE_NATIVE, SOURCE_TRANSLATED
+)
+from core import extract_video_id, is_video_id
+import llm_client
+from llm_client import GEMINI_MODEL, TASK_HISTORY
+from ui_translations import UI_STRINGS, load_catalog, translate_batch
+from summary_translations import get_summary_variant, prewarm_summary_variants
+from translation_cache import translation_cache, translation_key
+from prompts import RETRIEVAL_QUESTION_PROMPT
+import metrics
+from language_detect import is_english
+from translation_cache import retry_in_background
+from chat_memory import new_memory, add_turn, format_history
+from session_memory import ChatHistory, memory_report
+from jobs import submit_analysis, get_job, STATUS_DONE, STATUS_ERROR, STAGE_TRANSCRIPT, STAGE_SUMMARY
+
+# Load environment variables; the Gemini client configures itself on first call
 load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 # Enhanced AI Prompts
 SUMMARY_PROMPT = """You are a comprehensive YouTube video summarizer. 
@@ -25,6 +36,7 @@ QUESTION_PROMPT = """You are an advanced AI assistant designed to provide compre
 
 Context:
 - Video Summary: {summary}
+- Conversation so far: {history}
 - User Question: {question}
 
 Task: Generate a multi-faceted response that includes:
@@ -48,6 +60,9 @@ D. Potential Further Exploration
 
 Respond in a structured, clear manner in the {language} language."""
 
+# Chat messages rendered per page of history
+CHAT_PAGE_SIZE = 10
+
 # Language support
 LANGUAGE_OPTIONS = {
     'English': 'en',
@@ -80,111 +95,75 @@ LANGUAGE_NAMES = {
     'it': 'Italian'
 }
 
-# Initialize the translator with retry mechanism
+# Create the translator on first use only, once per server process, so
+# English-only sessions never import or construct it
+@st.cache_resource
 def get_translator():
-    for _ in range(3):
-        try:
-            return Translator(service_urls=[
-                'translate.google.com',
-                'translate.google.co.kr',
-                'translate.google.co.jp'
-            ])
-        except:
-            time.sleep(1)
-    # Fallback
-    return Translator()
-
-translator = get_translator()
+    from googletrans import Translator
+
+    try:
+        return Translator(service_urls=[
+            'translate.google.com',
+            'translate.google.co.kr',
+            'translate.google.co.jp'
+        ])
+    except Exception:
+        # Fallback
+        return Translator()
 
 # Initialize session state
 def init_session_state():
     if "summary" not in st.session_state:
         st.session_state.summary = None
+    if "summary_original" not in st.session_state:
+        st.session_state.summary_original = None
+    if "summary_key" not in st.session_state:
+        st.session_state.summary_key = None
+    if "summary_language" not in st.session_state:
+        st.session_state.summary_language = None
+    if "summary_pending_language" not in st.session_state:
+        st.session_state.summary_pending_language = None
     if "chat_messages" not in st.session_state:
-        st.session_state.chat_messages = []
+        # Older messages spill to disk once the session's memory budget is used up
+        st.session_state.chat_messages = ChatHistory()
+    if "chat_memory" not in st.session_state:
+        st.session_state.chat_memory = new_memory()
+    if "chat_display_limit" not in st.session_state:
+        st.session_state.chat_display_limit = CHAT_PAGE_SIZE
     if "video_link" not in st.session_state:
         st.session_state.video_link = ""
+    if "video_id" not in st.session_state:
+        st.session_state.video_id = None
+    if "summary_transcript_language" not in st.session_state:
+        st.session_state.summary_transcript_language = "en"
     if "video_title" not in st.session_state:
         st.session_state.video_title = ""
     if "language" not in st.session_state:
         st.session_state.language = "en"
     if "transcript_language" not in st.session_state:
         st.session_state.transcript_language = "en"
-    if "translation_cache" not in st.session_state:
-        st.session_state.translation_cache = {}
     if "debug_info" not in st.session_state:
         st.session_state.debug_info = ""
-
-# Extract YouTube Video ID from URL
-def extract_video_id(youtube_url):
-    try:
-        parsed_url = urlparse(youtube_url)
-        if parsed_url.hostname == "youtu.be":
-            return parsed_url.path[1:]
-        elif parsed_url.hostname in ("www.youtube.com", "youtube.com"):
-            return parse_qs(parsed_url.query).get("v", [None])[0]
-        return None
-    except Exception:
-        return None
-
-# Get transcript from YouTube with language support
-def extract_transcript_details(youtube_video_url, language_code='en'):
-    try:
-        video_id = extract_video_id(youtube_video_url)
-        if not video_id:
-            error_msg = "Invalid YouTube URL"
-            st.error(translate_ui_text(error_msg, st.session_state.language))
-            return None, None
-
-        # Fetch transcript with language options
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        
-        try:
-            # Try to get the transcript in the requested language
-            transcript = transcript_list.find_transcript([language_code])
-            success_msg = f"Found native transcript in selected language"
-            st.success(translate_ui_text(success_msg, st.session_state.language))
-        except:
-            try:
-                # If not available, try to get auto-generated and translate it
-                original_transcript = transcript_list.find_generated_transcript(['en'])
-                transcript = original_transcript.translate(language_code)
-                info_msg = f"Using YouTube's translated transcript"
-                st.info(translate_ui_text(info_msg, st.session_state.language))
-            except Exception as e:
-                warning_msg = f"Could not find transcript in selected language. Using available transcript."
-                st.warning(translate_ui_text(warning_msg, st.session_state.language))
-                # Get any available transcript
-                transcript = next(iter(transcript_list))
-        
-        transcript_data = transcript.fetch()
-        transcript_text = " ".join([item["text"] for item in transcript_data])
-
-        return transcript_text, video_id
-    except Exception as e:
-        error_msg = f"Error extracting transcript: {str(e)}"
-        st.error(translate_ui_text(error_msg, st.session_state.language))
-        return None, None
-
-# More robust language detection
-def is_english(text):
-    if not text or len(text) < 10:
-        return True
-        
-    try:
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Use a sample of the text for faster detection
-                sample = text[:150] if len(text) > 150 else text
-                detected = translator.detect(sample)
-                return detected.lang == 'en'
-            except Exception:
-                if attempt == max_retries - 1:
-                    return False
-                time.sleep(1)
-    except:
-        return False
+    if "job_id" not in st.session_state:
+        st.session_state.job_id = None
+    if "analysis_notices" not in st.session_state:
+        st.session_state.analysis_notices = []
+    if "transcript_resolution" not in st.session_state:
+        st.session_state.transcript_resolution = None
+    if "compression_report" not in st.session_state:
+        st.session_state.compression_report = None
+    if "debug_mode" not in st.session_state:
+        st.session_state.debug_mode = False
+
+# Tell the user which caption track the analysis is based on
+def show_transcript_source(source, track):
+    if source == SOURCE_NATIVE:
+        message = "Found native transcript in selected language"
+    elif source == SOURCE_TRANSLATED:
+        message = "Using YouTube's translated transcript"
+    else:
+        message = "Could not find transcript in selected language. Using available transcript."
+    st.caption(f"{translate_ui_text(message, st.session_state.language)} ({describe_track(track)})")
 
 # Translate text using googletrans with caching and retry
 def translate_text(text, target_language='en'):
@@ -193,28 +172,27 @@ def translate_text(text, target_language='en'):
         return text
     
     # Check cache first
-    cache_key = f"{text[:50]}_{target_language}"  # Use first 50 chars as key to avoid huge keys
-    if cache_key in st.session_state.translation_cache:
-        return st.session_state.translation_cache[cache_key]
+    cache_key = translation_key(text, target_language)
+    cached = translation_cache.get(cache_key)
+    if cached is not None:
+        return cached
         
+    translator = get_translator()
     try:
-        # Retry mechanism for more reliable translations
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                result = translator.translate(text, dest=target_language)
-                translated_text = result.text
-                # Save to cache
-                st.session_state.translation_cache[cache_key] = translated_text
-                return translated_text
-            except Exception:
-                if attempt == max_retries - 1:
-                    # Last attempt failed, return original
-                    return text
-                # Wait before retrying with exponential backoff
-                time.sleep(1 * (attempt + 1))
+        with metrics.stage("translate", language=target_language):
+            result = translator.translate(text, dest=target_language)
+        translated_text = result.text
+        # Save to cache
+        translation_cache.set(cache_key, translated_text)
+        return translated_text
     except Exception:
-        return text  # Return original text if translation fails
+        # Retry with backoff in the background so the next rerun finds it cached,
+        # and show the original text now instead of stalling the script thread
+        retry_in_background(
+            cache_key,
+            lambda: translator.translate(text, dest=target_language).text
+        )
+        return text
 
 # Helper function to translate UI text
 def translate_ui_text(text, target_language='en'):
@@ -222,63 +200,224 @@ def translate_ui_text(text, target_language='en'):
         return text
     
     # Check cache
-    cache_key = f"ui_{text}_{target_language}"
-    if cache_key in st.session_state.translation_cache:
-        return st.session_state.translation_cache[cache_key]
+    cache_key = translation_key(text, target_language, "ui")
+    cached = translation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Check the shipped catalog
+    catalog = load_catalog(target_language)
+    if text in catalog:
+        translation_cache.set(cache_key, catalog[text])
+        return catalog[text]
     
     try:
-        translated = translator.translate(text, dest=target_language).text
-        st.session_state.translation_cache[cache_key] = translated
+        with metrics.stage("translate.ui", language=target_language):
+            translated = get_translator().translate(text, dest=target_language).text
+        translation_cache.set(cache_key, translated)
         return translated
     except:
         return text
 
-# Generate summary using Google Gemini AI
-def generate_gemini_summary(transcript_text):
-    try:
-        model = genai.GenerativeModel("gemini-2.0-pro-exp")
-        response = model.generate_content(SUMMARY_PROMPT + transcript_text)
-        return response.text
-    except Exception as e:
-        error_msg = f"Error generating summary: {str(e)}"
-        st.error(translate_ui_text(error_msg, st.session_state.language))
-        return translate_ui_text("Unable to generate summary.", st.session_state.language)
+# Translate every static UI string in one batched request before the page renders
+def prefetch_ui_translations(target_language='en'):
+    if target_language == 'en':
+        return
+
+    catalog = load_catalog(target_language)
+    missing = []
+    for text in UI_STRINGS:
+        cache_key = translation_key(text, target_language, "ui")
+        if translation_cache.get(cache_key) is not None:
+            continue
+        if text in catalog:
+            translation_cache.set(cache_key, catalog[text])
+        else:
+            missing.append(text)
+
+    if missing:
+        try:
+            with metrics.stage("translate.ui_batch", language=target_language):
+                translations = translate_batch(missing, target_language, get_translator())
+            for text, translated in translations.items():
+                translation_cache.set(translation_key(text, target_language, "ui"), translated)
+        except Exception:
+            # translate_ui_text falls back to per-string requests
+            pass
+
+# Store a finished analysis in session state, translated to the interface language
+def complete_analysis(summary, video_id, transcript_language):
+    st.session_state.summary_original = summary
+    st.session_state.summary_key = make_cache_key(
+        video_id, transcript_language, GEMINI_MODEL, SUMMARY_PROMPT
+    )
+    st.session_state.summary_language = None
+    st.session_state.summary_pending_language = None
+    st.session_state.video_id = video_id
+    st.session_state.summary_transcript_language = transcript_language
+    st.session_state.video_title = f"YouTube Video (ID: {video_id})"
+    # Resolved from the cached track index, so it is the same on every rerun
+    st.session_state.transcript_resolution = cached_resolution(video_id, transcript_language)
+    localize_summary()
+
+# Show the summary in the interface language; each language is translated once
+# per summary and stored, so switching languages later is a cache lookup
+def localize_summary():
+    target_language = st.session_state.language
+    if not st.session_state.summary_original or st.session_state.summary_language == target_language:
+        return
+
+    if st.session_state.summary_pending_language == target_language:
+        # Translating failed earlier; pick up the variant once the background retry stores it
+        variant = get_cached_summary(make_variant_key(st.session_state.summary_key, target_language))
+        if variant is None:
+            prewarm_summary_variants(
+                st.session_state.summary_key,
+                st.session_state.video_id,
+                st.session_state.summary_original,
+                [target_language],
+                get_translator()
+            )
+            return
+        st.session_state.summary = variant
+    else:
+        try:
+            st.session_state.summary = get_summary_variant(
+                st.session_state.summary_key,
+                st.session_state.video_id,
+                st.session_state.summary_original,
+                target_language,
+                get_translator()
+            )
+        except Exception:
+            # Show the original now; the background retry stores the variant for a later rerun
+            st.session_state.summary = st.session_state.summary_original
+            st.session_state.summary_pending_language = target_language
+            prewarm_summary_variants(
+                st.session_state.summary_key,
+                st.session_state.video_id,
+                st.session_state.summary_original,
+                [target_language],
+                get_translator()
+            )
+            return
+    st.session_state.summary_language = target_language
+    st.session_state.summary_pending_language = None
+
+# Poll the background analysis job without rerunning the rest of the page
+@st.fragment(run_every=1.0)
+def show_analysis_progress():
+    job = get_job(st.session_state.job_id)
+    if job is None:
+        st.session_state.job_id = None
+        return
+
+    if job["status"] in (STATUS_DONE, STATUS_ERROR):
+        st.session_state.job_id = None
+        if job["status"] == STATUS_DONE:
+            complete_analysis(job["summary"], job["video_id"], job["language"])
+            st.session_state.compression_report = job["compression"]
+            st.session_state.analysis_notices = [
+                ("success", "Video analysis completed successfully!"),
+            ]
+        else:
+            st.session_state.analysis_notices = [
+                ("error", f"Error generating summary: {job['error']}"),
+            ]
+        # Render the summary and chat with a full rerun
+        st.rerun()
+
+    if job["stage"] == STAGE_TRANSCRIPT:
+        progress, stage_text = 0.2, "Fetching transcript..."
+    elif job["stage"] == STAGE_SUMMARY:
+        progress, stage_text = 0.5, "Generating analysis..."
+    else:
+        progress, stage_text = 0.0, "Waiting for a free analysis worker..."
+    st.progress(progress, text=translate_ui_text(stage_text, st.session_state.language))
+    if job["partial"]:
+        st.markdown(job["partial"])
+
+# Build the chat prompt from the transcript chunks most relevant to the question,
+# falling back to the full summary when no transcript or match is available
+def build_question_prompt(question, summary, target_language='en', video_id=None,
+                          transcript_language='en', history=''):
+    # Add language instruction directly in the prompt
+    language_name = LANGUAGE_NAMES.get(target_language, 'English')
+    history = history or "(no earlier questions)"
+
+    if video_id:
+        try:
+            # Imported here so NumPy only loads once a chat actually needs it
+            from retrieval import get_transcript_index, format_excerpts
+
+            chunks = get_transcript_index(video_id, transcript_language).search(question)
+            if chunks:
+                return RETRIEVAL_QUESTION_PROMPT.format(
+                    excerpts=format_excerpts(chunks),
+                    history=history,
+                    question=question,
+                    language=language_name
+                )
+        except Exception:
+            pass
+
+    return QUESTION_PROMPT.format(
+        summary=summary,
+        history=history,
+        question=question,
+        language=language_name
+    )
+
+# Stream a chat response into a placeholder, returning the final text
+def stream_ai_response(question, summary, target_language='en', video_id=None,
+                       transcript_language='en', history='', placeholder=None):
+    placeholder = placeholder or st.empty()
+    from answer_cache import answer_cache
+
+    # Repeat questions about the same video are answered from the shared cache; only
+    # questions asked without earlier turns are self-contained enough to share
+    video_key = f"{video_id}|{transcript_language}"
+    cacheable = bool(video_id) and not history
+    cached = answer_cache.get(video_key, target_language, question) if cacheable else None
+    if cached is not None:
+        placeholder.write(cached)
+        return cached
 
-# Enhanced Chatbot AI response function with direct language instruction
-def get_ai_response(question, summary, target_language='en'):
     try:
-        # Add language instruction directly in the prompt
-        language_name = LANGUAGE_NAMES.get(target_language, 'English')
-        
-        # Generate response with explicit language instruction
-        model = genai.GenerativeModel("gemini-2.0-pro-exp")
-        formatted_prompt = QUESTION_PROMPT.format(
-            summary=summary, 
-            question=question,
-            language=language_name
+        formatted_prompt = build_question_prompt(
+            question, summary, target_language, video_id, transcript_language, history
         )
-        
-        response = model.generate_content(formatted_prompt)
-        response_text = response.text
-        
-        # If response not in target language, force translation
+
+        response_text = placeholder.write_stream(stream_generate(formatted_prompt, GEMINI_MODEL))
+
+        # If response not in target language, replace the streamed text with a translation
+        in_target_language = True
         if target_language != 'en' and is_english(response_text):
-            response_text = translate_text(response_text, target_language)
-            
+            translated = translate_text(response_text, target_language)
+            # translate_text returns the English text unchanged when translating fails
+            in_target_language = translated != response_text and not is_english(translated)
+            response_text = translated
+            placeholder.write(response_text)
+
+        if cacheable and in_target_language:
+            answer_cache.set(video_key, target_language, question, response_text)
         return response_text
     except Exception as e:
         error_msg = f"Error generating response: {str(e)}"
-        translated_error = translate_ui_text(error_msg, target_language)
-        st.error(translated_error)
-        
+        st.error(translate_ui_text(error_msg, target_language))
+
         sorry_msg = "Sorry, I couldn't generate a comprehensive response."
         translated_sorry = translate_ui_text(sorry_msg, target_language)
+        placeholder.write(translated_sorry)
         return translated_sorry
 
 # Main Streamlit Application
 def main():
     # Initialize session state
     init_session_state()
+    metrics.start_metrics_server()
+    trace = metrics.start_trace()
+    prefetch_ui_translations(st.session_state.language)
 
     # Main App Title
     app_title = "🎥 Multilingual YouTube Video Analyzer & Chatbot"
@@ -310,11 +449,18 @@ def main():
         )
         # Store language code in session state
         st.session_state.language = LANGUAGE_OPTIONS[interface_language]
+        prefetch_ui_translations(st.session_state.language)
         
         # Clear cache button
         if st.button(translate_ui_text("Clear Translation Cache", st.session_state.language)):
-            st.session_state.translation_cache = {}
+            translation_cache.clear()
             st.success(translate_ui_text("Cache cleared!", st.session_state.language))
+        cache_stats = translation_cache.stats()
+        st.caption(
+            f"Translation cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['evictions']} evictions, {cache_stats['entries']} entries"
+        )
+        st.checkbox("Show debug info", key="debug_mode")
 
     # YouTube Link Input
     youtube_label = "Enter YouTube Video Link:"
@@ -332,38 +478,66 @@ def main():
         video_id = extract_video_id(youtube_link)
         if video_id:
             st.image(f"http://img.youtube.com/vi/{video_id}/0.jpg", use_container_width=True)
+        # Start fetching the transcript while the user is still looking at the thumbnail
+        if is_video_id(video_id):
+            prefetch_transcript(video_id, st.session_state.transcript_language)
 
     # Generate Summary Button
     analyze_btn_text = "Analyze Video"
     if st.button(translate_ui_text(analyze_btn_text, st.session_state.language)):
-        spinner_text = "Fetching transcript and generating analysis..."
-        with st.spinner(translate_ui_text(spinner_text, st.session_state.language)):
-            # Reset chat messages
-            st.session_state.chat_messages = []
-            
-            # Extract transcript with selected language
-            transcript_text, video_id = extract_transcript_details(youtube_link, st.session_state.transcript_language)
-
-            if transcript_text:
-                # Generate summary
-                summary = generate_gemini_summary(transcript_text)
-                
-                # Translate summary if interface language is different
-                if st.session_state.language != 'en':
-                    summary = translate_text(summary, st.session_state.language)
-                
-                # Store summary in session state
-                st.session_state.summary = summary
-                st.session_state.video_title = f"YouTube Video (ID: {video_id})"
-                
-                # Success message
+        # Reset chat messages
+        st.session_state.chat_messages.clear()
+        st.session_state.chat_memory = new_memory()
+        st.session_state.chat_display_limit = CHAT_PAGE_SIZE
+        st.session_state.analysis_notices = []
+        st.session_state.compression_report = None
+
+        video_id = extract_video_id(youtube_link)
+        if not video_id:
+            error_msg = "Invalid YouTube URL"
+            st.error(translate_ui_text(error_msg, st.session_state.language))
+        else:
+            # Reuse a summary from any earlier session before fetching anything
+            cache_key = make_cache_key(
+                video_id,
+                st.session_state.transcript_language,
+                GEMINI_MODEL,
+                SUMMARY_PROMPT
+            )
+            summary = get_cached_summary(cache_key)
+            metrics.increment("cache_requests_total", cache="summary",
+                              result="miss" if summary is None else "hit")
+
+            if summary:
+                complete_analysis(summary, video_id, st.session_state.transcript_language)
                 success_msg = "Video analysis completed successfully!"
                 st.success(translate_ui_text(success_msg, st.session_state.language))
+            else:
+                # Run the analysis on the background worker pool; this script only polls it
+                st.session_state.summary = None
+                st.session_state.summary_original = None
+                st.session_state.job_id = submit_analysis(
+                    video_id, st.session_state.transcript_language, GEMINI_MODEL
+                )
+
+    # Messages from an analysis that finished in the background
+    for kind, message in st.session_state.analysis_notices:
+        if kind == "success":
+            st.success(translate_ui_text(message, st.session_state.language))
+        else:
+            st.error(translate_ui_text(message, st.session_state.language))
+    st.session_state.analysis_notices = []
+
+    if st.session_state.job_id:
+        show_analysis_progress()
 
     # Display Summary
+    localize_summary()
     if st.session_state.summary:
         summary_title = "📌 Comprehensive Video Analysis:"
         st.markdown(f"## {translate_ui_text(summary_title, st.session_state.language)}")
+        if st.session_state.transcript_resolution:
+            show_transcript_source(*st.session_state.transcript_resolution)
         st.write(st.session_state.summary)
 
     # Chat Interface
@@ -371,8 +545,13 @@ def main():
         chat_title = "💬 Interactive Video Insights"
         st.markdown(f"## {translate_ui_text(chat_title, st.session_state.language)}")
 
-        # Display existing chat messages
-        for msg in st.session_state.chat_messages:
+        # Display the most recent chat messages, paging back on request
+        hidden = len(st.session_state.chat_messages) - st.session_state.chat_display_limit
+        if hidden > 0:
+            if st.button(translate_ui_text("Show earlier messages", st.session_state.language)):
+                st.session_state.chat_display_limit += CHAT_PAGE_SIZE
+                st.rerun()
+        for msg in st.session_state.chat_messages[max(hidden, 0):]:
             st.chat_message("user").write(msg['question'])
             st.chat_message("assistant").write(msg['answer'])
 
@@ -387,23 +566,42 @@ def main():
             # Display the user's question immediately
             st.chat_message("user").write(current_question)
             
-            spinner_text = "Generating comprehensive response..."
-            with st.spinner(translate_ui_text(spinner_text, st.session_state.language)):
-                # Generate AI response using the selected language
-                ai_response = get_ai_response(
+            # Stream the AI response in the selected language as it is generated
+            with st.chat_message("assistant"):
+                ai_response = stream_ai_response(
                     current_question,
                     st.session_state.summary,
-                    st.session_state.language
+                    st.session_state.language,
+                    st.session_state.video_id,
+                    st.session_state.summary_transcript_language,
+                    format_history(st.session_state.chat_memory)
                 )
 
-                # Display the response
-                st.chat_message("assistant").write(ai_response)
-
-                # Add to chat history
-                st.session_state.chat_messages.append({
-                    'question': current_question,
-                    'answer': ai_response
-                })
+            # Add to chat history; older turns are compressed into a running summary
+            st.session_state.chat_messages.append({
+                'question': current_question,
+                'answer': ai_response
+            })
+            add_turn(
+                st.session_state.chat_memory,
+                current_question,
+                ai_response,
+                lambda prompt: llm_client.generate(prompt, GEMINI_MODEL, task=TASK_HISTORY)
+            )
+
+    # Keep the stage timings of the last run that did real work for the debug panel
+    if any("seconds" in record for record in trace):
+        st.session_state.debug_info = metrics.format_trace(trace)
+    if st.session_state.debug_mode:
+        with st.sidebar.expander("Debug info", expanded=True):
+            st.code(st.session_state.debug_info or "No stages recorded yet", language=None)
+            report = st.session_state.compression_report
+            if report:
+                st.caption(
+                    f"Transcript tokens: {report['tokens_before']} -> {report['tokens_after']} "
+                    f"({report['segments_before']} -> {report['segments_after']} segments)"
+                )
+            st.code(memory_report(st.session_state), language=None)
 
 # Run the application
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from core import expand_sources, TRANSCRIPT_COMPRESSION
+from transcripts import get_transcript
+from summarizer import summarize_transcript, GEMINI_MODEL
+from summary_cache import CACHE_DIR, make_cache_key, get_cached_summary, store_summary
+from prompts import SUMMARY_PROMPT
+from transcript_compression import compress_segments
+
+# Per-stage concurrency: transcript fetches are cheap, LLM calls are rate limited
+TRANSCRIPT_WORKERS = int(os.getenv("BATCH_TRANSCRIPT_WORKERS", 8))
+SUMMARY_WORKERS = int(os.getenv("BATCH_SUMMARY_WORKERS", 4))
+# Where the Batch page writes results; web users never choose the path themselves
+BATCH_RESULTS_DIR = os.path.join(CACHE_DIR, "batch_results")
+
+def load_completed(output_path):
+    """
+    Read the video IDs already summarized successfully in a previous run
+
+    Args:
+        output_path (str): JSONL results file
+
+    Returns:
+        set: Completed video IDs
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash can leave a truncated final line
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["video_id"])
+    return completed
+
+
+def run_batch(video_ids, output_path, language_code='en', model_name=GEMINI_MODEL,
+              transcript_workers=TRANSCRIPT_WORKERS, summary_workers=SUMMARY_WORKERS,
+              on_result=None):
+    """
+    Summarize many videos concurrently, appending one JSON line per video
+
+    Transcript fetches and summaries run on separate pools so each stage has its
+    own concurrency limit. Videos already marked "ok" in output_path are skipped.
+
+    Args:
+        video_ids (list): YouTube video IDs
+        output_path (str): JSONL file results are appended to
+        language_code (str): Preferred transcript language
+        model_name (str): Gemini model to use
+        transcript_workers (int): Concurrent transcript fetches
+        summary_workers (int): Concurrent summary generations
+        on_result (callable, optional): Called with each result dict as it completes
+
+    Returns:
+        dict: Counts of "ok", "error" and "skipped" videos plus "videos_per_minute"
+    """
+    completed = load_completed(output_path)
+    pending = [video_id for video_id in video_ids if video_id not in completed]
+    stats = {"ok": 0, "error": 0, "skipped": len(video_ids) - len(pending)}
+    write_lock = threading.Lock()
+    started = time.time()
+
+    def record(result):
+        with write_lock:
+            with open(output_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            stats[result["status"]] += 1
+        if on_result:
+            on_result(result)
+
+    def summarize_stage(result, cache_key, transcript_text, segments):
+        stage_start = time.time()
+        try:
+            result["summary"] = summarize_transcript(transcript_text, segments, model_name)
+            store_summary(cache_key, result["video_id"], result["summary"])
+            result["status"] = "ok"
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = f"Error generating summary: {str(e)}"
+        result["summary_seconds"] = round(time.time() - stage_start, 3)
+        record(result)
+
+    with ThreadPoolExecutor(max_workers=max(1, summary_workers)) as summary_pool:
+        def transcript_stage(video_id):
+            cache_key = make_cache_key(video_id, language_code, model_name, SUMMARY_PROMPT)
+            result = {
+                "video_id": video_id,
+                "url": f"https://www.youtube.com/watch?v={video_id}",
+                "language": language_code,
+            }
+            cached = get_cached_summary(cache_key)
+            if cached is not None:
+                result.update(status="ok", summary=cached, cached=True)
+                record(result)
+                return
+            stage_start = time.time()
+            try:
+                transcript = get_transcript(video_id, language_code)
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = f"Error extracting transcript: {str(e)}"
+                record(result)
+                return
+            result["transcript_source"] = transcript.source
+            result["transcript_track"] = transcript.track
+            result["transcript_seconds"] = round(time.time() - stage_start, 3)
+            text, segments = transcript.text, transcript.segments()
+            if TRANSCRIPT_COMPRESSION:
+                text, segments, report = compress_segments(segments)
+                result.update(report)
+            summary_pool.submit(summarize_stage, result, cache_key, text, segments)
+
+        with ThreadPoolExecutor(max_workers=max(1, transcript_workers)) as transcript_pool:
+            list(transcript_pool.map(transcript_stage, pending))
+
+    elapsed_minutes = (time.time() - started) / 60
+    processed = stats["ok"] + stats["error"]
+    stats["videos_per_minute"] = round(processed / elapsed_minutes, 2) if elapsed_minutes else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Summarize a playlist or a list of YouTube videos to JSONL"
+    )
+    parser.add_argument("sources", nargs="+",
+                        help="Video URLs, playlist URLs or files with one URL per line")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl",
+                        help="JSONL output file; completed videos in it are skipped")
+    parser.add_argument("-l", "--language", default="en", help="Transcript language code")
+    parser.add_argument("--model", default=GEMINI_MODEL,
+                        help="Gemini model name, or 'auto' to pick a tier per call")
+    parser.add_argument("--transcript-workers", type=int, default=TRANSCRIPT_WORKERS)
+    parser.add_argument("--summary-workers", type=int, default=SUMMARY_WORKERS)
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    video_ids, errors = expand_sources(args.sources)
+    for error in errors:
+        print(f"[error] {error['input']} {error['error']}")
+    print(f"Processing {len(video_ids)} videos -> {args.output}")
+
+    def report(result):
+        print(f"[{result['status']}] {result['video_id']} {result.get('error', '')}".rstrip())
+
+    stats = run_batch(
+        video_ids,
+        args.output,
+        language_code=args.language,
+        model_name=args.model,
+        transcript_workers=args.transcript_workers,
+        summary_workers=args.summary_workers,
+        on_result=report
+    )
+    print(
+        f"Done: {stats['ok']} ok, {stats['error']} failed, {stats['skipped']} skipped "
+        f"({stats['videos_per_minute']} videos/min)"
+    )
+
+
+if __name__ == "__main__":
+    main()
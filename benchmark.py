@@ -0,0 +1,388 @@
+"""
+Offline benchmark for the analyze and chat pipelines
+
+Swaps YouTubeTranscriptApi, the Gemini backend and the googletrans Translator
+for local stand-ins with configurable latency and failure injection, then drives
+the app's own analysis jobs and chat path over synthetic transcripts of increasing length.
+Also checks that importing the app stays within a cold-start time budget.
+
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --compare bench_baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Keep benchmark caches away from the real ones, and empty for every run
+os.environ["VIDEO_SUMMARIZER_CACHE_DIR"] = tempfile.mkdtemp(prefix="video-summarizer-bench-")
+
+import core
+import jobs
+import llm_client
+import transcripts
+
+# Budget for importing the app in a fresh interpreter, before any page renders
+COLD_START_BUDGET_SECONDS = 3.0
+
+# Synthetic transcript lengths in seconds: 1 minute to 5 hours
+DEFAULT_LENGTHS = [60, 600, 3600, 18000]
+SEGMENT_SECONDS = 4.0
+WORDS_PER_SEGMENT = 11
+# Languages the fake English auto-generated track can be translated to
+FAKE_TRANSLATION_LANGUAGES = ("es", "fr", "de", "it", "pt", "hi", "ja", "ko", "zh-Hans")
+VOCABULARY = (
+    "the video explains how models learn from data and why training matters "
+    "we discuss results experiments future work questions answers examples "
+    "energy climate market history science music language brain memory"
+).split()
+
+
+class FakeTranscript:
+    def __init__(self, video_id, language_code, latency, failure_rate, rng, is_generated=False):
+        self.video_id = video_id
+        self.language_code = language_code
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = rng
+        self.is_generated = is_generated
+        self.translation_languages = [
+            {"language": code, "language_code": code} for code in FAKE_TRANSLATION_LANGUAGES
+        ] if is_generated else []
+
+    def translate(self, language_code):
+        return FakeTranscript(self.video_id, language_code, self.latency, self.failure_rate, self.rng)
+
+    def fetch(self):
+        time.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            raise ConnectionError("Injected transcript fetch failure")
+        # Video IDs look like "bench<seconds>x<n>"
+        seconds = int(self.video_id[len("bench"):].split("x")[0])
+        rng = random.Random(self.video_id)
+        return [
+            {
+                "text": " ".join(rng.choice(VOCABULARY) for _ in range(WORDS_PER_SEGMENT)),
+                "start": i * SEGMENT_SECONDS,
+                "duration": SEGMENT_SECONDS,
+            }
+            for i in range(int(seconds / SEGMENT_SECONDS))
+        ]
+
+
+class FakeTranscriptList:
+    def __init__(self, video_id, latency, failure_rate, rng):
+        self.video_id = video_id
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = rng
+
+    def _transcript(self, language_code, is_generated=False):
+        return FakeTranscript(
+            self.video_id, language_code, self.latency, self.failure_rate, self.rng, is_generated
+        )
+
+    def find_transcript(self, language_codes):
+        return self._transcript(language_codes[0])
+
+    def find_manually_created_transcript(self, language_codes):
+        return self._transcript(language_codes[0])
+
+    def find_generated_transcript(self, language_codes):
+        return self._transcript(language_codes[0], is_generated=True)
+
+    def __iter__(self):
+        # One manual and one auto-generated English track, like a typical upload
+        return iter([self._transcript("en"), self._transcript("en", is_generated=True)])
+
+
+class FakeTranscriptApi:
+    """Stand-in for YouTubeTranscriptApi producing synthetic transcripts"""
+
+    latency = 0.3
+    failure_rate = 0.0
+    rng = random.Random(0)
+
+    @classmethod
+    def list_transcripts(cls, video_id):
+        time.sleep(cls.latency / 2)
+        return FakeTranscriptList(video_id, cls.latency, cls.failure_rate, cls.rng)
+
+
+class FakeTranslation:
+    def __init__(self, text, lang):
+        self.text = text
+        self.lang = lang
+
+
+class FakeTranslator:
+    """Stand-in for googletrans.Translator with per-request and per-character latency"""
+
+    def __init__(self, latency=0.2, chars_per_second=20000.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+
+    def _call(self, text):
+        time.sleep(self.latency + len(text) / self.chars_per_second)
+        if self.rng.random() < self.failure_rate:
+            raise ConnectionError("Injected translation failure")
+
+    def translate(self, text, dest='en'):
+        self._call(text)
+        return FakeTranslation(f"[{dest}] {text}", dest)
+
+    def detect(self, text):
+        self._call(text)
+        return FakeTranslation(text, "en")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(name, func, iterations):
+    """
+    Run func(iteration) repeatedly and report latency, throughput and peak memory
+
+    Args:
+        name (str): Scenario name
+        func (callable): Function called with the iteration number
+        iterations (int): Number of runs
+
+    Returns:
+        dict: Scenario results
+    """
+    latencies = []
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "p50_seconds": round(statistics.median(latencies), 4),
+        "p95_seconds": round(percentile(latencies, 0.95), 4),
+        "throughput_per_second": round(iterations / elapsed, 3) if elapsed else 0.0,
+        "peak_memory_mb": round(peak / (1024 * 1024), 2),
+    }
+    print(
+        f"{name:<28} p50 {result['p50_seconds']:>8.3f}s  p95 {result['p95_seconds']:>8.3f}s  "
+        f"{result['throughput_per_second']:>8.2f}/s  peak {result['peak_memory_mb']:>8.2f} MB"
+    )
+    return result
+
+
+def install_fakes(args):
+    """
+    Replace every network dependency with a local stand-in
+
+    Returns:
+        module: The app module, imported with fakes in place
+    """
+    FakeTranscriptApi.latency = args.transcript_latency
+    FakeTranscriptApi.failure_rate = args.failure_rate
+    transcripts.YouTubeTranscriptApi = FakeTranscriptApi
+
+    llm_client.set_backend(llm_client.FakeBackend(
+        latency=args.llm_latency,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        failure_rate=args.failure_rate,
+        seed=0
+    ))
+    # Benchmark the pipeline, not the production rate limit
+    llm_client.rate_limiter = llm_client.TokenBucket(1e6, 1e6)
+
+    import app
+
+    translator = FakeTranslator(args.translate_latency, failure_rate=args.failure_rate)
+    app.get_translator = lambda: translator
+    app.init_session_state()
+    return app
+
+
+def measure_cold_start(runs=3):
+    """
+    Time importing the app in fresh interpreters, i.e. the work done before first render
+
+    Args:
+        runs (int): Number of fresh interpreters to start
+
+    Returns:
+        dict: Scenario results with the median import time
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    result = {
+        "name": "cold_start",
+        "iterations": runs,
+        "p50_seconds": round(statistics.median(timings), 4),
+        "p95_seconds": round(max(timings), 4),
+        "throughput_per_second": 0.0,
+        "peak_memory_mb": 0.0,
+    }
+    print(f"{'cold_start':<28} p50 {result['p50_seconds']:>8.3f}s  max {result['p95_seconds']:>8.3f}s")
+    return result
+
+
+class FakePlaceholder:
+    """
+    Stand-in for the st.empty() placeholder chat answers stream into
+    """
+
+    def write_stream(self, stream):
+        return "".join(stream)
+
+    def write(self, text):
+        pass
+
+
+def run_analysis(video_id, language_code="en"):
+    """
+    Analyze a video through the background job queue, as the Analyze button does
+
+    Args:
+        video_id (str): Fake video ID
+        language_code (str): Transcript language
+
+    Returns:
+        str: Generated summary
+    """
+    job_id = jobs.submit_analysis(video_id, language_code, llm_client.GEMINI_MODEL)
+    while True:
+        job = jobs.get_job(job_id)
+        if job["status"] == jobs.STATUS_DONE:
+            return job["summary"]
+        if job["status"] == jobs.STATUS_ERROR:
+            raise RuntimeError(job["error"])
+        time.sleep(0.01)
+
+
+def run_benchmarks(args):
+    app = install_fakes(args)
+    results = []
+
+    for seconds in args.lengths:
+        label = f"{seconds // 60}min" if seconds < 3600 else f"{seconds / 3600:g}h"
+
+        def video_id(i):
+            return f"bench{seconds}x{i}"
+
+        app.st.session_state.language = "en"
+        results.append(measure(
+            f"transcript[{label}]",
+            lambda i: core.fetch_transcript(f"https://www.youtube.com/watch?v={video_id(i)}", "en"),
+            args.iterations
+        ))
+
+        # Transcripts are already stored, as after a prefetch; this covers compression and summary
+        results.append(measure(
+            f"analysis[{label}]",
+            lambda i: run_analysis(video_id(i)),
+            args.iterations
+        ))
+
+        summary = run_analysis(video_id(0))
+        results.append(measure(
+            f"translate[{label}]",
+            lambda i: app.translate_text(f"{i} {summary}", "es"),
+            args.iterations
+        ))
+
+        # Distinct questions so the answer cache does not short-circuit the pipeline
+        results.append(measure(
+            f"chat[{label}]",
+            lambda i: app.stream_ai_response(
+                f"What does the video say about {VOCABULARY[i % len(VOCABULARY)]} ({i})?",
+                summary, "en", video_id(0), "en", placeholder=FakePlaceholder()
+            ),
+            args.iterations
+        ))
+
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """
+    Compare p95 latency and peak memory against a saved baseline
+
+    Returns:
+        bool: True if nothing regressed beyond the tolerance
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {item["name"]: item for item in json.load(f)["results"]}
+
+    ok = True
+    for result in results:
+        previous = baseline.get(result["name"])
+        if not previous:
+            continue
+        for metric in ("p95_seconds", "peak_memory_mb"):
+            limit = previous[metric] * (1 + tolerance)
+            if result[metric] > limit and result[metric] - previous[metric] > 0.001:
+                print(f"REGRESSION {result['name']} {metric}: {previous[metric]} -> {result[metric]}")
+                ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the analyze and chat pipelines")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--lengths", type=lambda v: [int(x) for x in v.split(",")],
+                        default=DEFAULT_LENGTHS, help="Comma-separated transcript lengths in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds before first token")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--output-tokens", type=int, default=300)
+    parser.add_argument("--transcript-latency", type=float, default=0.3)
+    parser.add_argument("--translate-latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability of an injected failure per upstream call")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative regression when comparing")
+    parser.add_argument("--cold-start-budget", type=float, default=COLD_START_BUDGET_SECONDS,
+                        help="Fail if importing the app takes longer than this many seconds")
+    args = parser.parse_args()
+
+    cold_start = measure_cold_start()
+    results = [cold_start] + run_benchmarks(args)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    failed = False
+    if cold_start["p50_seconds"] > args.cold_start_budget:
+        print(f"COLD START over budget: {cold_start['p50_seconds']}s > {args.cold_start_budget}s")
+        failed = True
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
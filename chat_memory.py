@@ -0,0 +1,135 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from chunking import estimate_tokens
+from prompts import CHAT_HISTORY_SUMMARY_PROMPT
+
+# Turns kept verbatim; older ones are folded into a running summary
+CHAT_RECENT_TURNS = int(os.getenv("CHAT_RECENT_TURNS", 4))
+# Token budget for the whole history section of a chat prompt
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", 1500))
+# Characters kept from an answer when it is shown verbatim in the history
+ANSWER_EXCERPT_CHARS = 1200
+# Upper bound on the running summary when no model is available to compress it
+SUMMARY_MAX_CHARS = 2000
+# Prefix of the question list used as the summary when no model is available
+EARLIER_QUESTIONS = "Earlier questions:"
+# Background threads folding old turns into running summaries, shared by all sessions
+CHAT_FOLD_WORKERS = int(os.getenv("CHAT_FOLD_WORKERS", 2))
+
+_fold_executor = ThreadPoolExecutor(max_workers=CHAT_FOLD_WORKERS, thread_name_prefix="chat-memory")
+
+
+def new_memory():
+    """
+    Create an empty conversation memory
+
+    Returns:
+        dict: Memory with a running "summary", the most recent "turns" and the
+            "pending" turns still being folded into the summary
+    """
+    return {"summary": "", "turns": [], "pending": [], "folding": False, "lock": threading.Lock()}
+
+
+def _format_turn(turn):
+    answer = turn["answer"]
+    if len(answer) > ANSWER_EXCERPT_CHARS:
+        answer = answer[:ANSWER_EXCERPT_CHARS] + "..."
+    return f"User: {turn['question']}\nAssistant: {answer}"
+
+
+def format_history(memory):
+    """
+    Render the memory for a prompt, within CHAT_HISTORY_TOKEN_BUDGET
+
+    Args:
+        memory (dict): Memory from new_memory()
+
+    Returns:
+        str: History text, empty for a new conversation
+    """
+    with memory["lock"]:
+        summary = memory["summary"]
+        # Turns not folded in yet are shown verbatim alongside the previous summary
+        turns = memory["pending"] + memory["turns"]
+    parts = []
+    if summary:
+        parts.append(f"Summary of earlier conversation: {summary}")
+    recent = [_format_turn(turn) for turn in turns]
+    # Drop the oldest verbatim turns first if the budget is exceeded
+    while recent and estimate_tokens("\n\n".join(parts + recent)) > CHAT_HISTORY_TOKEN_BUDGET:
+        recent.pop(0)
+    return "\n\n".join(parts + recent)
+
+
+def _fold_summary(summary, folded, summarize):
+    # Merge folded turns into the summary, reducing them to their questions without a model
+    if summarize is not None:
+        turns = "\n\n".join(_format_turn(turn) for turn in folded)
+        try:
+            return summarize(
+                CHAT_HISTORY_SUMMARY_PROMPT.format(summary=summary or "(none)", turns=turns)
+            ).strip()
+        except Exception:
+            pass
+    # One "Earlier questions:" list that grows with each fold, oldest questions trimmed first
+    head, _, earlier = summary.partition(EARLIER_QUESTIONS)
+    head = head.strip()
+    questions = [question for question in earlier.strip().split("; ") if question]
+    questions += [turn["question"] for turn in folded]
+    limit = SUMMARY_MAX_CHARS - len(head) - len(EARLIER_QUESTIONS) - 2
+    while len(questions) > 1 and len("; ".join(questions)) > limit:
+        questions.pop(0)
+    return f"{head} {EARLIER_QUESTIONS} {'; '.join(questions)}".strip()
+
+
+def _fold_pending(memory, summarize):
+    # Turns that become pending while a fold runs are folded together in the next round
+    while True:
+        with memory["lock"]:
+            folded = list(memory["pending"])
+            summary = memory["summary"]
+            if not folded:
+                memory["folding"] = False
+                return
+        summary = _fold_summary(summary, folded, summarize)
+        with memory["lock"]:
+            memory["summary"] = summary
+            del memory["pending"][:len(folded)]
+
+
+def add_turn(memory, question, answer, summarize=None):
+    """
+    Record a chat turn, folding the oldest turns into the running summary once
+    more than CHAT_RECENT_TURNS are kept or the history exceeds its budget
+
+    Folding with a model runs in the background so the turn returns at once;
+    until it finishes, format_history() shows the folded turns verbatim with
+    the previous summary.
+
+    Args:
+        memory (dict): Memory from new_memory()
+        question (str): User question
+        answer (str): Assistant answer
+        summarize (callable, optional): Function taking a prompt and returning text;
+            without it, folded turns are reduced to their questions
+    """
+    with memory["lock"]:
+        memory["turns"].append({"question": question, "answer": answer})
+
+        def verbatim_tokens():
+            return estimate_tokens("\n\n".join(_format_turn(turn) for turn in memory["turns"]))
+
+        while len(memory["turns"]) > 1 and (
+            len(memory["turns"]) > CHAT_RECENT_TURNS or verbatim_tokens() > CHAT_HISTORY_TOKEN_BUDGET
+        ):
+            memory["pending"].append(memory["turns"].pop(0))
+        if not memory["pending"] or memory["folding"]:
+            return
+        memory["folding"] = True
+
+    if summarize is None:
+        _fold_pending(memory, None)
+    else:
+        _fold_executor.submit(_fold_pending, memory, summarize)
@@ -0,0 +1,146 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Rough token estimate used for budgeting; Gemini averages ~4 characters per token
+CHARS_PER_TOKEN = 4
+
+# Transcripts above this size are summarized with map-reduce instead of one call
+CHUNKING_THRESHOLD_TOKENS = int(os.getenv("CHUNKING_THRESHOLD_TOKENS", 30000))
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", 8000))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 200))
+CHUNK_MAX_WORKERS = int(os.getenv("CHUNK_MAX_WORKERS", 4))
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a piece of text
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        int: Approximate token count
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def format_timestamp(seconds):
+    """
+    Format a position in the video as H:MM:SS or M:SS
+
+    Args:
+        seconds (float): Offset from the start of the video
+
+    Returns:
+        str: Formatted timestamp
+    """
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+def chunk_segments(segments, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """
+    Split transcript segments into token-budgeted windows along segment boundaries
+
+    Consecutive windows share up to overlap_tokens worth of trailing segments so
+    that ideas spanning a boundary are not lost.
+
+    Args:
+        segments (list): Transcript segments with "text" and optional "start"/"duration"
+        max_tokens (int): Token budget per window
+        overlap_tokens (int): Tokens repeated at the start of the next window
+
+    Returns:
+        list: Dicts with "text", "start" and "end" for each window
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        first, last = current[0], current[-1]
+        chunks.append({
+            "text": " ".join(item["text"] for item in current),
+            "start": first.get("start", 0.0),
+            "end": last.get("start", 0.0) + last.get("duration", 0.0),
+        })
+
+    for segment in segments:
+        tokens = estimate_tokens(segment["text"])
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+            # Carry the tail of the previous window over as overlap
+            overlap = []
+            overlap_size = 0
+            for item in reversed(current):
+                item_tokens = estimate_tokens(item["text"])
+                if overlap_size + item_tokens > overlap_tokens:
+                    break
+                overlap.insert(0, item)
+                overlap_size += item_tokens
+            current = overlap
+            current_tokens = overlap_size
+        current.append(segment)
+        current_tokens += tokens
+
+    if current:
+        flush()
+    return chunks
+
+
+def map_reduce_summary(segments, generate, map_prompt, reduce_prompt,
+                       max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS,
+                       max_workers=CHUNK_MAX_WORKERS, reduce_generate=None):
+    """
+    Summarize a long transcript by summarizing chunks concurrently and merging them
+
+    Args:
+        segments (list): Transcript segments
+        generate (callable): Function taking a prompt and returning the model's text
+        map_prompt (str): Per-chunk prompt with a {time_range} placeholder
+        reduce_prompt (str): Prompt used to merge partial summaries
+        max_tokens (int): Token budget per chunk
+        overlap_tokens (int): Overlap between consecutive chunks
+        max_workers (int): Maximum number of concurrent model calls
+        reduce_generate (callable, optional): Used for merge calls instead of generate
+
+    Returns:
+        str: Merged summary
+    """
+    reduce_generate = reduce_generate or generate
+    chunks = chunk_segments(segments, max_tokens, overlap_tokens)
+
+    def summarize_chunk(chunk):
+        time_range = f"{format_timestamp(chunk['start'])}-{format_timestamp(chunk['end'])}"
+        return time_range, generate(map_prompt.format(time_range=time_range) + chunk["text"])
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        partials = [
+            f"[{time_range}]\n{text}"
+            for time_range, text in executor.map(summarize_chunk, chunks)
+        ]
+
+    # Merge hierarchically if the partial summaries are still too large for one call
+    while len(partials) > 1 and estimate_tokens("\n\n".join(partials)) > max_tokens:
+        groups = []
+        group = []
+        for partial in partials:
+            if group and estimate_tokens("\n\n".join(group + [partial])) > max_tokens:
+                groups.append(group)
+                group = []
+            group.append(partial)
+        groups.append(group)
+        if len(groups) == len(partials):
+            break
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups)))) as executor:
+            partials = list(executor.map(
+                lambda group: reduce_generate(reduce_prompt + "\n\n".join(group)), groups
+            ))
+
+    return reduce_generate(reduce_prompt + "\n\n".join(partials))
@@ -0,0 +1,79 @@
+import argparse
+import itertools
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from core import VideoSummarizerError, error_result, expand_sources, summarize_video, GEMINI_MODEL
+
+
+def run(videos, language_code='en', model_name=GEMINI_MODEL, jobs=1, use_cache=True):
+    """
+    Summarize videos in parallel, yielding results in input order
+
+    Args:
+        videos (list): Video URLs or IDs
+        language_code (str): Preferred transcript language
+        model_name (str): Gemini model to use
+        jobs (int): Videos processed at once
+        use_cache (bool): Use the shared summary cache
+
+    Yields:
+        dict: Result of summarize_video() with "status" "ok", or "input",
+            "status" "error", "error_type" and "error" for failures
+    """
+    def process(video):
+        try:
+            result = summarize_video(video, language_code, model_name, use_cache)
+            result["status"] = "ok"
+        except VideoSummarizerError as e:
+            result = error_result(video, e)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        yield from executor.map(process, videos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="video-summarizer",
+        description="Summarize YouTube videos from the command line"
+    )
+    parser.add_argument("sources", nargs="+",
+                        help="Video URLs or IDs, playlist URLs or files with one URL per line")
+    parser.add_argument("-l", "--language", default="en", help="Transcript language code")
+    parser.add_argument("--model", default=GEMINI_MODEL,
+                        help="Gemini model name, or 'auto' to pick a tier per call")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Videos processed in parallel")
+    parser.add_argument("--json", action="store_true",
+                        help="Print one JSON object per video instead of plain text")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always regenerate instead of using the summary cache")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+
+    failed = 0
+    videos, errors = expand_sources(args.sources)
+    results = itertools.chain(
+        errors, run(videos, args.language, args.model, args.jobs, not args.no_cache)
+    )
+    for result in results:
+        if result["status"] == "error":
+            failed += 1
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        elif result["status"] == "error":
+            print(f"{result['input']}: {result['error']}", file=sys.stderr)
+        else:
+            heading = result["video_id"]
+            if "tokens_before" in result:
+                heading += f" ({result['tokens_before']} -> {result['tokens_after']} transcript tokens)"
+            print(f"# {heading}\n\n{result['summary']}\n", flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+import os
+import re
+import urllib.request
+from urllib.parse import urlparse, parse_qs
+
+from transcripts import get_transcript
+from summarizer import summarize_transcript, GEMINI_MODEL
+from summary_cache import make_cache_key, get_cached_summary, store_summary
+from prompts import SUMMARY_PROMPT
+
+# Set TRANSCRIPT_COMPRESSION=0 to send transcripts to the model verbatim
+TRANSCRIPT_COMPRESSION = os.getenv("TRANSCRIPT_COMPRESSION", "1") == "1"
+
+_VIDEO_ID = re.compile(r"^[\w-]{11}$")
+_PLAYLIST_VIDEO_ID = re.compile(r'"videoId":"([\w-]{11})"')
+
+
+class VideoSummarizerError(Exception):
+    """
+    Base class for errors raised by the summarizer core
+    """
+
+
+class InvalidVideoURLError(VideoSummarizerError):
+    """
+    The input is not a YouTube video URL or video ID
+    """
+
+
+class PlaylistUnavailableError(VideoSummarizerError):
+    """
+    The videos of a playlist could not be listed
+    """
+
+
+class TranscriptUnavailableError(VideoSummarizerError):
+    """
+    No transcript could be fetched for the video
+    """
+
+
+class SummaryError(VideoSummarizerError):
+    """
+    The model failed to produce a summary
+    """
+
+
+def extract_video_id(youtube_url):
+    """
+    Extract YouTube video ID from a given URL
+
+    Args:
+        youtube_url (str): YouTube video URL
+
+    Returns:
+        str or None: Video ID if valid, None otherwise
+    """
+    try:
+        parsed_url = urlparse(youtube_url)
+        if parsed_url.hostname == "youtu.be":
+            return parsed_url.path[1:]
+        elif parsed_url.hostname in ("www.youtube.com", "youtube.com"):
+            return parse_qs(parsed_url.query).get("v", [None])[0]
+        return None
+    except Exception:
+        return None
+
+
+def is_video_id(value):
+    """
+    Check whether a string has the shape of a YouTube video ID
+
+    Args:
+        value (str): Candidate video ID
+
+    Returns:
+        bool: True for 11 URL-safe characters
+    """
+    return bool(value and _VIDEO_ID.match(value))
+
+
+def resolve_video_id(video):
+    """
+    Accept either a video URL or a bare video ID
+
+    Args:
+        video (str): YouTube video URL or ID
+
+    Returns:
+        str: Video ID
+
+    Raises:
+        InvalidVideoURLError: If no video ID can be found
+    """
+    video = video.strip()
+    video_id = video if is_video_id(video) else extract_video_id(video)
+    if not video_id:
+        raise InvalidVideoURLError(f"Invalid YouTube URL: {video}")
+    return video_id
+
+
+def extract_playlist_id(url):
+    """
+    Extract the playlist ID from a YouTube playlist URL
+
+    Args:
+        url (str): YouTube URL
+
+    Returns:
+        str or None: Playlist ID if present, None otherwise
+    """
+    try:
+        return parse_qs(urlparse(url).query).get("list", [None])[0]
+    except Exception:
+        return None
+
+
+def extract_playlist_video_ids(playlist_id):
+    """
+    List the video IDs of a public playlist from its YouTube page
+
+    Only the videos embedded in the first page load are returned
+    (YouTube renders the first 100).
+
+    Args:
+        playlist_id (str): YouTube playlist ID
+
+    Returns:
+        list: Video IDs in playlist order
+    """
+    request = urllib.request.Request(
+        f"https://www.youtube.com/playlist?list={playlist_id}",
+        headers={"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        html = response.read().decode("utf-8", errors="replace")
+    # dict.fromkeys keeps first-seen order while dropping repeats
+    return list(dict.fromkeys(_PLAYLIST_VIDEO_ID.findall(html)))
+
+
+def error_result(video, error):
+    """
+    Describe a failed input in the shape used by the CLI and batch runners
+
+    Args:
+        video (str): Input as given by the user
+        error (VideoSummarizerError): What went wrong
+
+    Returns:
+        dict: "input", "status" "error", "error_type" and "error"
+    """
+    return {"input": video, "status": "error", "error_type": type(error).__name__, "error": str(error)}
+
+
+def expand_sources(sources):
+    """
+    Expand files of URLs and playlist URLs into individual video IDs
+
+    Args:
+        sources (list): Video URLs or IDs, playlist URLs or paths to files with one per line
+
+    Returns:
+        tuple: (video_ids, errors) where video_ids are unique and in input order,
+            and errors are error_result() dicts for inputs that are not videos
+            and playlists that could not be listed
+    """
+    lines = []
+    for source in sources:
+        if os.path.isfile(source):
+            with open(source, encoding="utf-8") as f:
+                lines.extend(
+                    line.strip() for line in f
+                    if line.strip() and not line.lstrip().startswith("#")
+                )
+        else:
+            lines.append(source)
+
+    video_ids = []
+    errors = []
+    for line in lines:
+        try:
+            video_ids.append(resolve_video_id(line))
+            continue
+        except InvalidVideoURLError as e:
+            playlist_id = extract_playlist_id(line)
+            if not playlist_id:
+                errors.append(error_result(line, e))
+                continue
+        try:
+            video_ids.extend(extract_playlist_video_ids(playlist_id))
+        except OSError as e:
+            # URLError and timeouts are OSErrors; one bad playlist should not end the run
+            errors.append(error_result(line, PlaylistUnavailableError(f"Error listing playlist: {str(e)}")))
+    return list(dict.fromkeys(video_ids)), errors
+
+
+def fetch_transcript(video, language_code='en'):
+    """
+    Get the transcript of a video, from the local store when available
+
+    Args:
+        video (str): YouTube video URL or ID
+        language_code (str): Preferred transcript language
+
+    Returns:
+        tuple: (video_id, StoredTranscript)
+
+    Raises:
+        InvalidVideoURLError: If the input is not a video
+        TranscriptUnavailableError: If no transcript can be fetched
+    """
+    video_id = resolve_video_id(video)
+    try:
+        return video_id, get_transcript(video_id, language_code)
+    except Exception as e:
+        raise TranscriptUnavailableError(f"Error extracting transcript: {str(e)}") from e
+
+
+def summarize_text(transcript_text, segments=None, model_name=GEMINI_MODEL):
+    """
+    Summarize a transcript
+
+    Args:
+        transcript_text (str): Video transcript
+        segments (list, optional): Transcript segments used to chunk long videos
+        model_name (str): Gemini model to use
+
+    Returns:
+        str: Generated summary
+
+    Raises:
+        SummaryError: If generation fails
+    """
+    try:
+        return summarize_transcript(transcript_text, segments, model_name)
+    except Exception as e:
+        raise SummaryError(f"Error generating summary: {str(e)}") from e
+
+
+def summarize_video(video, language_code='en', model_name=GEMINI_MODEL, use_cache=True):
+    """
+    Fetch and summarize a video, reusing and filling the shared summary cache
+
+    Args:
+        video (str): YouTube video URL or ID
+        language_code (str): Preferred transcript language
+        model_name (str): Gemini model to use
+        use_cache (bool): Look up and store the summary in the summary cache
+
+    Returns:
+        dict: "video_id", "language", "transcript_source" (None for cached
+            summaries), "transcript_track", "summary" and "cached", plus the compression report
+            ("tokens_before", "tokens_after", ...) for fresh summaries
+
+    Raises:
+        VideoSummarizerError: Subclass describing the failed step
+    """
+    video_id = resolve_video_id(video)
+    cache_key = make_cache_key(video_id, language_code, model_name, SUMMARY_PROMPT)
+    result = {"video_id": video_id, "language": language_code, "transcript_source": None}
+
+    if use_cache:
+        cached = get_cached_summary(cache_key)
+        if cached is not None:
+            result.update(summary=cached, cached=True)
+            return result
+
+    _, transcript = fetch_transcript(video_id, language_code)
+    text, segments = transcript.text, transcript.segments()
+    if TRANSCRIPT_COMPRESSION:
+        # Imported here so NumPy only loads once a transcript is summarized
+        from transcript_compression import compress_segments
+
+        text, segments, report = compress_segments(segments)
+        result.update(report)
+    summary = summarize_text(text, segments, model_name)
+    if use_cache:
+        store_summary(cache_key, video_id, summary)
+    result.update(transcript_source=transcript.source, transcript_track=transcript.track,
+                  summary=summary, cached=False)
+    return result
@@ -0,0 +1,229 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from summary_cache import CACHE_DIR, make_cache_key, store_summary
+from transcripts import get_transcript
+from summarizer import summarize_transcript, GEMINI_MODEL
+from singleflight import analysis_flight
+from prompts import SUMMARY_PROMPT
+from core import TRANSCRIPT_COMPRESSION
+from summary_translations import prewarm_summary_variants
+
+JOBS_PATH = os.path.join(CACHE_DIR, "jobs.db")
+# Cap on analyses running at once in this process, however many tabs are open
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 4))
+# Minimum seconds between partial-summary writes while a summary streams in
+PROGRESS_INTERVAL = 0.5
+# Finished jobs older than this are deleted
+JOB_RETENTION_SECONDS = 24 * 60 * 60
+
+# Job lifecycle
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+
+# Stages reported while a job runs
+STAGE_TRANSCRIPT = "transcript"
+STAGE_SUMMARY = "summary"
+
+_lock = threading.Lock()
+_executor = None
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+_COLUMNS = (
+    "job_id", "cache_key", "video_id", "language", "model", "status", "stage",
+    "transcript_source", "partial", "summary", "error", "compression", "created_at", "updated_at",
+)
+
+
+def _connect():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(JOBS_PATH, timeout=10)
+    with _schema_lock:
+        if not _schema_ready:
+            _create_schema(conn)
+    return conn
+
+
+def _create_schema(conn):
+    # Runs once per process rather than on every status poll
+    global _schema_ready
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            cache_key TEXT NOT NULL,
+            video_id TEXT NOT NULL,
+            language TEXT NOT NULL,
+            model TEXT NOT NULL,
+            status TEXT NOT NULL,
+            stage TEXT,
+            transcript_source TEXT,
+            partial TEXT,
+            summary TEXT,
+            error TEXT,
+            compression TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )"""
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_cache_key ON jobs (cache_key, status)")
+    # Job databases created before the compression report was stored
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if "compression" not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN compression TEXT")
+    conn.commit()
+    _schema_ready = True
+
+
+def _update(job_id, **fields):
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    conn = _connect()
+    try:
+        conn.execute(
+            f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+            (*fields.values(), job_id)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _get_executor():
+    # Created on first submit; jobs a previous server process left unfinished are requeued
+    global _executor
+    with _lock:
+        if _executor is not None:
+            return _executor
+        _executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+        conn = _connect()
+        try:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (STATUS_DONE, STATUS_ERROR, time.time() - JOB_RETENTION_SECONDS)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ?, stage = NULL, partial = NULL WHERE status = ?",
+                (STATUS_QUEUED, STATUS_RUNNING)
+            )
+            conn.commit()
+            unfinished = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ?", (STATUS_QUEUED,)
+            ).fetchall()
+        finally:
+            conn.close()
+        for (job_id,) in unfinished:
+            _executor.submit(_run_job, job_id)
+        return _executor
+
+
+def _run_job(job_id):
+    job = get_job(job_id)
+    if job is None or job["status"] != STATUS_QUEUED:
+        return
+
+    def work():
+        _update(job_id, status=STATUS_RUNNING, stage=STAGE_TRANSCRIPT)
+        transcript = get_transcript(job["video_id"], job["language"])
+        _update(job_id, stage=STAGE_SUMMARY, transcript_source=transcript.source)
+
+        last_write = [0.0]
+
+        def on_progress(partial):
+            now = time.monotonic()
+            if now - last_write[0] >= PROGRESS_INTERVAL:
+                last_write[0] = now
+                _update(job_id, partial=partial)
+
+        text, segments = transcript.text, transcript.segments()
+        compression = None
+        if TRANSCRIPT_COMPRESSION:
+            # Imported here so NumPy only loads once a transcript is summarized
+            from transcript_compression import compress_segments
+
+            text, segments, compression = compress_segments(segments)
+        summary = summarize_transcript(text, segments, job["model"], on_progress)
+        store_summary(job["cache_key"], job["video_id"], summary)
+        prewarm_summary_variants(job["cache_key"], job["video_id"], summary)
+        return summary, transcript.source, compression
+
+    try:
+        with metrics.stage("job.analysis", model=job["model"]):
+            summary, source, compression = analysis_flight.do(job["cache_key"], work)[0]
+        _update(job_id, status=STATUS_DONE, stage=None, partial=None,
+                summary=summary, transcript_source=source,
+                compression=json.dumps(compression) if compression else None)
+    except Exception as e:
+        _update(job_id, status=STATUS_ERROR, stage=None, partial=None, error=str(e))
+
+
+def submit_analysis(video_id, language_code='en', model_name=GEMINI_MODEL):
+    """
+    Queue a video for background analysis, joining an identical job already in progress
+
+    Args:
+        video_id (str): YouTube video ID
+        language_code (str): Preferred transcript language
+        model_name (str): Gemini model to use
+
+    Returns:
+        str: Job ID to poll with get_job()
+    """
+    executor = _get_executor()
+    cache_key = make_cache_key(video_id, language_code, model_name, SUMMARY_PROMPT)
+    now = time.time()
+    with _lock:
+        conn = _connect()
+        try:
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE cache_key = ? AND status IN (?, ?)",
+                (cache_key, STATUS_QUEUED, STATUS_RUNNING)
+            ).fetchone()
+            if row:
+                metrics.increment("jobs_total", result="joined")
+                return row[0]
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                """INSERT INTO jobs (job_id, cache_key, video_id, language, model, status,
+                created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, cache_key, video_id, language_code, model_name, STATUS_QUEUED, now, now)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    metrics.increment("jobs_total", result="submitted")
+    executor.submit(_run_job, job_id)
+    return job_id
+
+
+def get_job(job_id):
+    """
+    Read the current state of a job
+
+    Args:
+        job_id (str): ID from submit_analysis()
+
+    Returns:
+        dict or None: Job fields, including "status", "stage", "partial", "summary" and
+            "compression", the report from compress_segments() or None
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    job = dict(zip(_COLUMNS, row))
+    job["compression"] = json.loads(job["compression"]) if job["compression"] else None
+    return job
@@ -0,0 +1,96 @@
+import re
+import unicodedata
+
+# Offline language identification: Unicode script for non-Latin languages,
+# stopword frequency for the Latin-script languages the app supports
+
+# Script name prefix (from unicodedata.name) to language code
+SCRIPT_LANGUAGES = {
+    "HIRAGANA": "ja",
+    "KATAKANA": "ja",
+    "HANGUL": "ko",
+    "CJK": "zh-cn",
+    "ARABIC": "ar",
+    "CYRILLIC": "ru",
+    "DEVANAGARI": "hi",
+}
+
+STOPWORDS = {
+    "en": set("the and of to in is that it for was on are with as this be at by you not have from or".split()),
+    "es": set("el la de que y en los se del las un por con no una su para es al lo como".split()),
+    "fr": set("le la les de des et en un une est du que qui dans pour pas sur au avec ce".split()),
+    "de": set("der die das und ist nicht ein eine zu den von mit sich des auf für im dem auch".split()),
+    "pt": set("o a os as de que e do da em um uma para com não por se na no é".split()),
+    "it": set("il la di che e un una per non in sono del della è si con lo gli le".split()),
+}
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Characters inspected per call; enough to decide, cheap on long summaries
+SAMPLE_CHARS = 1000
+
+
+def _script_language(sample):
+    counts = {}
+    letters = 0
+    for char in sample:
+        if not char.isalpha():
+            continue
+        letters += 1
+        if ord(char) < 0x250:
+            continue
+        name = unicodedata.name(char, "")
+        for prefix, code in SCRIPT_LANGUAGES.items():
+            if name.startswith(prefix):
+                counts[code] = counts.get(code, 0) + 1
+                break
+    if not counts or not letters:
+        return None
+    # Japanese text mixes kana with CJK ideographs
+    if counts.get("ja"):
+        counts["ja"] += counts.pop("zh-cn", 0)
+    code, count = max(counts.items(), key=lambda item: item[1])
+    return code if count / letters > 0.3 else None
+
+
+def detect_language(text):
+    """
+    Guess the language of a text without any network call
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        str or None: Language code, or None if the text is too short to tell
+    """
+    if not text:
+        return None
+    sample = text[:SAMPLE_CHARS]
+    script = _script_language(sample)
+    if script:
+        return script
+
+    words = [word.lower() for word in _WORD_PATTERN.findall(sample)]
+    if len(words) < 3:
+        return None
+    scores = {
+        code: sum(1 for word in words if word in stopwords)
+        for code, stopwords in STOPWORDS.items()
+    }
+    code, score = max(scores.items(), key=lambda item: item[1])
+    return code if score else None
+
+
+def is_english(text):
+    """
+    Check whether a text is English, treating short or undecidable text as English
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        bool: True if the text looks English
+    """
+    if not text or len(text) < 10:
+        return True
+    return detect_language(text) in ("en", None)
@@ -0,0 +1,459 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+import metrics
+from chunking import estimate_tokens
+
+# Pass as the model name to let route() pick a tier per call
+AUTO_MODEL = "auto"
+# Default model, per-call timeout and retry policy for every Gemini call
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", AUTO_MODEL)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 120))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 1.0))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", 30.0))
+
+# Process-wide request rate shared by every session: sustained rate and burst size
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", 2.0))
+LLM_BURST = int(os.getenv("LLM_BURST", 5))
+# Process-wide cap on model calls in flight, covering analyses, chunk workers and chat
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+
+# HTTP status codes worth retrying: rate limited, server error, unavailable, timeout
+RETRYABLE_STATUS_CODES = {429, 500, 503, 504}
+
+# Model tiers used by routing, from fastest to most capable
+MODEL_TIERS = [
+    os.getenv("GEMINI_FAST_MODEL", "gemini-2.0-flash-lite"),
+    os.getenv("GEMINI_STANDARD_MODEL", "gemini-2.0-flash"),
+    os.getenv("GEMINI_LARGE_MODEL", "gemini-2.0-pro-exp"),
+]
+# Prompts up to SHORT tokens start on the fast tier, up to LONG on the standard tier
+ROUTE_SHORT_TOKENS = int(os.getenv("ROUTE_SHORT_TOKENS", 4000))
+ROUTE_LONG_TOKENS = int(os.getenv("ROUTE_LONG_TOKENS", 16000))
+# "latency" routes one tier down, "quality" one tier up
+LLM_BUDGET = os.getenv("LLM_BUDGET", "balanced")
+# Retries on an overloaded tier before falling back to the next one
+ROUTE_FALLBACK_RETRIES = 1
+
+# Kinds of calls, used to adjust the tier picked from the prompt size
+TASK_SUMMARY = "summary"
+TASK_MAP = "map"
+TASK_REDUCE = "reduce"
+TASK_CHAT = "chat"
+TASK_HISTORY = "history"
+_TASK_TIER_OFFSETS = {TASK_SUMMARY: 1, TASK_MAP: -1, TASK_REDUCE: 1, TASK_CHAT: 0, TASK_HISTORY: -1}
+_BUDGET_TIER_OFFSETS = {"latency": -1, "balanced": 0, "quality": 1}
+
+
+class LLMError(Exception):
+    """Base class for errors raised by LLM backends"""
+
+
+class RateLimitError(LLMError):
+    """Raised by backends when the provider rejects a call with HTTP 429"""
+
+    code = 429
+
+
+class ServiceUnavailableError(LLMError):
+    """Raised by backends when the provider is temporarily unavailable"""
+
+    code = 503
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter; callers wait in turn for a token instead of failing
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Take a token, returning how long the caller must wait before using it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Block until a request may be sent
+        """
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """
+        Wait without blocking the event loop until a request may be sent
+        """
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class GeminiBackend:
+    """
+    Backend calling Google Gemini, reusing one configured model object per model name
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._configured = False
+
+    def _model(self, model_name):
+        with self._lock:
+            if not self._configured:
+                import google.generativeai as genai
+
+                genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+                self._genai = genai
+                self._configured = True
+            if model_name not in self._models:
+                self._models[model_name] = self._genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def generate(self, prompt, model_name, timeout):
+        response = self._model(model_name).generate_content(
+            prompt, request_options={"timeout": timeout}
+        )
+        return response.text
+
+    def stream(self, prompt, model_name, timeout):
+        response = self._model(model_name).generate_content(
+            prompt, stream=True, request_options={"timeout": timeout}
+        )
+        for chunk in response:
+            # Chunks without text parts (e.g. safety metadata) raise on .text
+            if chunk.parts:
+                yield chunk.text
+
+    async def agenerate(self, prompt, model_name, timeout):
+        response = await self._model(model_name).generate_content_async(
+            prompt, request_options={"timeout": timeout}
+        )
+        return response.text
+
+
+class FakeBackend:
+    """
+    Offline stand-in for load tests: simulated latency, token rate and failures
+    """
+
+    def __init__(self, latency=0.2, tokens_per_second=200.0, output_tokens=300,
+                 failure_rate=0.0, rate_limit_rate=0.0, seed=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            raise RateLimitError("429 Resource has been exhausted (fake backend)")
+        if roll < self.rate_limit_rate + self.failure_rate:
+            raise ServiceUnavailableError("503 Service unavailable (fake backend)")
+
+    def _words(self, prompt):
+        return [f"word{(len(prompt) + i) % 997}" for i in range(self.output_tokens)]
+
+    def generate(self, prompt, model_name, timeout):
+        self._roll()
+        time.sleep(self.latency + self.output_tokens / self.tokens_per_second)
+        return " ".join(self._words(prompt))
+
+    def stream(self, prompt, model_name, timeout):
+        self._roll()
+        time.sleep(self.latency)
+        for word in self._words(prompt):
+            time.sleep(1 / self.tokens_per_second)
+            yield word + " "
+
+    async def agenerate(self, prompt, model_name, timeout):
+        self._roll()
+        await asyncio.sleep(self.latency + self.output_tokens / self.tokens_per_second)
+        return " ".join(self._words(prompt))
+
+
+_backend = GeminiBackend()
+rate_limiter = TokenBucket(LLM_RATE_PER_SECOND, LLM_BURST)
+concurrency_limiter = threading.BoundedSemaphore(max(1, LLM_MAX_CONCURRENCY))
+
+
+def set_backend(backend):
+    """
+    Replace the backend used by every call, e.g. with a FakeBackend for load tests
+
+    Args:
+        backend: Object with generate, stream and agenerate methods
+
+    Returns:
+        The previous backend
+    """
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
+
+
+def is_retryable(error):
+    """
+    Decide whether a failed call is worth retrying
+
+    Args:
+        error (Exception): Error raised by the backend
+
+    Returns:
+        bool: True for rate limits, timeouts and transient server errors
+    """
+    if isinstance(error, (RateLimitError, TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    # google.api_core exceptions expose the HTTP status as .code
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt, error=None):
+    """
+    Jittered exponential backoff, waiting longer after rate-limit errors
+
+    Args:
+        attempt (int): Zero-based retry number
+        error (Exception, optional): Error that triggered the retry
+
+    Returns:
+        float: Seconds to wait
+    """
+    base = LLM_BACKOFF_BASE * (2 ** attempt)
+    if isinstance(error, RateLimitError) or getattr(error, "code", None) == 429:
+        base *= 2
+    return random.uniform(0, min(LLM_BACKOFF_MAX, base))
+
+
+def is_overloaded(error):
+    """
+    Decide whether a failed call means the model is overloaded, so another tier may help
+
+    Args:
+        error (Exception): Error raised by the backend
+
+    Returns:
+        bool: True for rate limits and unavailable-service errors
+    """
+    if isinstance(error, (RateLimitError, ServiceUnavailableError)):
+        return True
+    return getattr(error, "code", None) in (429, 503)
+
+
+def route(task, prompt_tokens, budget=None):
+    """
+    Choose the models to try for a call, best fit first
+
+    The tier follows the prompt size, shifted by the kind of task and by the
+    latency/cost budget. Fallbacks are the smaller tiers, then the larger ones.
+
+    Args:
+        task (str or None): One of the TASK_* constants
+        prompt_tokens (int): Estimated prompt tokens
+        budget (str, optional): "latency", "balanced" or "quality"; LLM_BUDGET by default
+
+    Returns:
+        list: Model names in the order to try them
+    """
+    budget = budget or LLM_BUDGET
+    if prompt_tokens <= ROUTE_SHORT_TOKENS:
+        tier = 0
+    elif prompt_tokens <= ROUTE_LONG_TOKENS:
+        tier = 1
+    else:
+        tier = 2
+    tier += _TASK_TIER_OFFSETS.get(task, 0) + _BUDGET_TIER_OFFSETS.get(budget, 0)
+    tier = max(0, min(len(MODEL_TIERS) - 1, tier))
+
+    order = [tier] + list(range(tier - 1, -1, -1)) + list(range(tier + 1, len(MODEL_TIERS)))
+    models = list(dict.fromkeys(MODEL_TIERS[i] for i in order))
+    metrics.increment("llm_route_total", task=task or "general", model=models[0], budget=budget)
+    return models
+
+
+def _candidates(prompt, model_name, task, max_retries):
+    # (model, retries) pairs to try; only routed calls have fallbacks
+    if model_name != AUTO_MODEL:
+        return [(model_name, max_retries)]
+    models = route(task, estimate_tokens(prompt))
+    return [
+        (model, max_retries if i == len(models) - 1 else min(max_retries, ROUTE_FALLBACK_RETRIES))
+        for i, model in enumerate(models)
+    ]
+
+
+def _fallback(error, model_name, task, is_last):
+    # Re-raise unless another tier should be tried
+    if is_last or not is_overloaded(error):
+        raise error
+    metrics.increment("llm_route_fallbacks_total", task=task or "general",
+                      model=model_name, error=type(error).__name__)
+
+
+def generate(prompt, model_name=GEMINI_MODEL, timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES,
+             task=None):
+    """
+    Generate a complete response, retrying transient failures
+
+    Args:
+        prompt (str): Full prompt text
+        model_name (str): Model to use, or AUTO_MODEL to route by task and size
+        timeout (float): Per-call timeout in seconds
+        max_retries (int): Retries after the first attempt
+        task (str, optional): TASK_* constant used for routing
+
+    Returns:
+        str: Response text
+    """
+    candidates = _candidates(prompt, model_name, task, max_retries)
+    for i, (candidate, retries) in enumerate(candidates):
+        try:
+            return _generate(prompt, candidate, timeout, retries)
+        except Exception as e:
+            _fallback(e, candidate, task, i == len(candidates) - 1)
+
+
+def _generate(prompt, model_name, timeout, max_retries):
+    for attempt in range(max_retries + 1):
+        with metrics.stage("llm.rate_limit_wait"):
+            rate_limiter.acquire()
+        with metrics.stage("llm.concurrency_wait"):
+            concurrency_limiter.acquire()
+        try:
+            with metrics.stage("llm.generate", model=model_name):
+                return _backend.generate(prompt, model_name, timeout)
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            metrics.increment("llm_retries_total", model=model_name, error=type(e).__name__)
+            error = e
+        finally:
+            concurrency_limiter.release()
+        # Back off without holding a concurrency slot
+        time.sleep(backoff_delay(attempt, error))
+
+
+def stream(prompt, model_name=GEMINI_MODEL, timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES,
+           task=None):
+    """
+    Stream a response, retrying transient failures that happen before the first chunk
+
+    Args:
+        prompt (str): Full prompt text
+        model_name (str): Model to use, or AUTO_MODEL to route by task and size
+        timeout (float): Per-call timeout in seconds
+        max_retries (int): Retries after the first attempt
+        task (str, optional): TASK_* constant used for routing
+
+    Yields:
+        str: Text fragments in the order they are generated
+    """
+    candidates = _candidates(prompt, model_name, task, max_retries)
+    for i, (candidate, retries) in enumerate(candidates):
+        started = False
+        try:
+            for text in _stream(prompt, candidate, timeout, retries):
+                started = True
+                yield text
+            return
+        except Exception as e:
+            if started:
+                raise
+            _fallback(e, candidate, task, i == len(candidates) - 1)
+
+
+def _stream(prompt, model_name, timeout, max_retries):
+    for attempt in range(max_retries + 1):
+        with metrics.stage("llm.rate_limit_wait"):
+            rate_limiter.acquire()
+        with metrics.stage("llm.concurrency_wait"):
+            concurrency_limiter.acquire()
+        started = False
+        request_start = time.perf_counter()
+        try:
+            for text in _backend.stream(prompt, model_name, timeout):
+                if not started:
+                    metrics.observe("llm_time_to_first_token_seconds",
+                                    time.perf_counter() - request_start, model=model_name)
+                started = True
+                yield text
+            metrics.observe("stage_duration_seconds", time.perf_counter() - request_start,
+                            stage="llm.stream", status="ok")
+            return
+        except Exception as e:
+            # Text already shown to the user can't be retried transparently
+            if started or attempt == max_retries or not is_retryable(e):
+                raise
+            metrics.increment("llm_retries_total", model=model_name, error=type(e).__name__)
+            error = e
+        finally:
+            concurrency_limiter.release()
+        time.sleep(backoff_delay(attempt, error))
+
+
+async def agenerate(prompt, model_name=GEMINI_MODEL, timeout=LLM_TIMEOUT,
+                    max_retries=LLM_MAX_RETRIES, task=None):
+    """
+    Async version of generate() for use from event loops
+
+    Args:
+        prompt (str): Full prompt text
+        model_name (str): Model to use, or AUTO_MODEL to route by task and size
+        timeout (float): Per-call timeout in seconds
+        max_retries (int): Retries after the first attempt
+        task (str, optional): TASK_* constant used for routing
+
+    Returns:
+        str: Response text
+    """
+    candidates = _candidates(prompt, model_name, task, max_retries)
+    for i, (candidate, retries) in enumerate(candidates):
+        try:
+            return await _agenerate(prompt, candidate, timeout, retries)
+        except Exception as e:
+            _fallback(e, candidate, task, i == len(candidates) - 1)
+
+
+async def _agenerate(prompt, model_name, timeout, max_retries):
+    for attempt in range(max_retries + 1):
+        await rate_limiter.acquire_async()
+        # Poll rather than block so the event loop keeps running and cancellation cannot leak a slot
+        while not concurrency_limiter.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        try:
+            with metrics.stage("llm.generate", model=model_name):
+                return await asyncio.wait_for(
+                    _backend.agenerate(prompt, model_name, timeout), timeout
+                )
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            metrics.increment("llm_retries_total", model=model_name, error=type(e).__name__)
+            error = e
+        finally:
+            concurrency_limiter.release()
+        await asyncio.sleep(backoff_delay(attempt, error))
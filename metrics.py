@@ -0,0 +1,212 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Level of the structured stage logs; INFO emits one JSON line per stage, WARNING silences them
+METRICS_LOG_LEVEL = os.getenv("METRICS_LOG_LEVEL", "INFO").upper()
+
+logger = logging.getLogger("video_summarizer.metrics")
+logger.setLevel(METRICS_LOG_LEVEL)
+if not logger.handlers:
+    # Python's default last-resort handler drops INFO, so stage logs need their own
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+# Latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_server = None
+
+# Stage records for the current script run, shown in the debug panel
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def increment(name, amount=1, **labels):
+    """
+    Increase a counter, e.g. retries or cache hits
+
+    Args:
+        name (str): Metric name
+        amount (float): Amount to add
+        **labels: Metric labels
+    """
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.append({"counter": name, "amount": amount, **labels})
+
+
+def observe(name, seconds, **labels):
+    """
+    Record a duration in a latency histogram
+
+    Args:
+        name (str): Metric name
+        seconds (float): Observed duration
+        **labels: Metric labels
+    """
+    key = (name, _label_key(labels))
+    with _lock:
+        histogram = _histograms.setdefault(
+            key, {"count": 0, "sum": 0.0, "buckets": [0] * len(LATENCY_BUCKETS)}
+        )
+        histogram["count"] += 1
+        histogram["sum"] += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][i] += 1
+
+
+@contextmanager
+def stage(name, **labels):
+    """
+    Time a pipeline stage, recording a histogram sample and a structured log line
+
+    Args:
+        name (str): Stage name, e.g. "transcript.fetch"
+        **labels: Extra labels such as the model or language
+    """
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        observe("stage_duration_seconds", seconds, stage=name, status=status)
+        record = {"stage": name, "status": status, "seconds": round(seconds, 4), **labels}
+        logger.info(json.dumps(record, ensure_ascii=False))
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.append(record)
+
+
+def start_trace():
+    """
+    Start collecting stage records for the current thread's script run
+
+    Returns:
+        list: Records appended by stage() and increment()
+    """
+    trace = []
+    _current_trace.set(trace)
+    return trace
+
+
+def format_trace(trace):
+    """
+    Render collected stage records for the debug panel
+
+    Args:
+        trace (list): Records from start_trace()
+
+    Returns:
+        str: One line per stage or counter
+    """
+    lines = []
+    for record in trace:
+        if "counter" in record:
+            extra = " ".join(
+                f"{key}={value}" for key, value in record.items() if key not in ("counter", "amount")
+            )
+            lines.append(f"{record['counter']:<24} +{record['amount']} {extra}".rstrip())
+        else:
+            extra = " ".join(
+                f"{key}={value}" for key, value in record.items()
+                if key not in ("stage", "status", "seconds")
+            )
+            lines.append(f"{record['stage']:<24} {record['seconds']:>8.3f}s {record['status']} {extra}".rstrip())
+    return "\n".join(lines)
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = [(key, value.replace("\\", "\\\\").replace('"', '\\"')) for key, value in pairs]
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def export_prometheus():
+    """
+    Render all metrics in the Prometheus text exposition format
+
+    Returns:
+        str: Metrics text
+    """
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(_histograms.items())
+
+    typed = set()
+    for (name, label_key), value in counters:
+        metric = f"video_summarizer_{name}"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_format_labels(label_key)} {value}")
+
+    for (name, label_key), histogram in histograms:
+        metric = f"video_summarizer_{name}"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} histogram")
+            typed.add(metric)
+        for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+            lines.append(f"{metric}_bucket{_format_labels(label_key, [('le', str(bound))])} {count}")
+        lines.append(f"{metric}_bucket{_format_labels(label_key, [('le', '+Inf')])} {histogram['count']}")
+        lines.append(f"{metric}_sum{_format_labels(label_key)} {histogram['sum']}")
+        lines.append(f"{metric}_count{_format_labels(label_key)} {histogram['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = export_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=None):
+    """
+    Serve /metrics for Prometheus from a background thread, once per process
+
+    Args:
+        port (int, optional): Port to listen on; defaults to METRICS_PORT, disabled if unset
+    """
+    global _server
+    port = port or os.getenv("METRICS_PORT")
+    with _lock:
+        if _server is not None or not port:
+            return
+        try:
+            _server = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetricsHandler)
+        except OSError as e:
+            logger.warning("Could not start metrics server on port %s: %s", port, e)
+            return
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
@@ -0,0 +1,101 @@
+import os
+import queue
+import threading
+import uuid
+
+import streamlit as st
+from dotenv import load_dotenv
+
+from batch import run_batch, BATCH_RESULTS_DIR, TRANSCRIPT_WORKERS, SUMMARY_WORKERS
+from core import expand_sources
+
+# Load environment variables
+load_dotenv()
+
+LANGUAGE_CODES = ['en', 'es', 'fr', 'de', 'ja', 'zh-cn', 'hi', 'ar', 'ru', 'pt', 'ko', 'it']
+
+
+def main():
+    st.title("📦 Batch Video Analysis")
+
+    sources_text = st.text_area(
+        "Video or playlist URLs (one per line):",
+        height=200
+    )
+    language_code = st.selectbox("Transcript language:", LANGUAGE_CODES)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        transcript_workers = st.number_input(
+            "Concurrent transcript fetches", min_value=1, max_value=32, value=TRANSCRIPT_WORKERS
+        )
+    with col2:
+        summary_workers = st.number_input(
+            "Concurrent summaries", min_value=1, max_value=16, value=SUMMARY_WORKERS
+        )
+
+    if not st.button("Run Batch"):
+        return
+
+    sources = [line.strip() for line in sources_text.splitlines() if line.strip()]
+    with st.spinner("Resolving videos..."):
+        video_ids, errors = expand_sources(sources)
+    for error in errors:
+        st.error(f"{error['input']}: {error['error']}")
+    if not video_ids:
+        st.error("No valid YouTube video or playlist URLs found")
+        return
+
+    # Each run writes to its own generated file; the user downloads it when done
+    os.makedirs(BATCH_RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(BATCH_RESULTS_DIR, f"{uuid.uuid4().hex}.jsonl")
+
+    # Workers can't touch Streamlit elements, so results are handed over through a queue
+    results = queue.Queue()
+    outcome = {}
+
+    def worker():
+        outcome["stats"] = run_batch(
+            video_ids,
+            output_path,
+            language_code=language_code,
+            transcript_workers=int(transcript_workers),
+            summary_workers=int(summary_workers),
+            on_result=results.put
+        )
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
+    progress = st.progress(0.0, text=f"0 / {len(video_ids)} videos")
+    log = st.container()
+    done = 0
+    while thread.is_alive() or not results.empty():
+        try:
+            result = results.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        done += 1
+        progress.progress(min(done / len(video_ids), 1.0), text=f"{done} / {len(video_ids)} videos")
+        if result["status"] == "ok":
+            log.success(f"{result['video_id']}")
+        else:
+            log.error(f"{result['video_id']}: {result.get('error', '')}")
+    thread.join()
+
+    stats = outcome.get("stats")
+    if stats:
+        progress.progress(1.0, text=f"{len(video_ids)} / {len(video_ids)} videos")
+        st.success(
+            f"Done: {stats['ok']} ok, {stats['error']} failed, {stats['skipped']} skipped "
+            f"({stats['videos_per_minute']} videos/min)"
+        )
+    if os.path.exists(output_path):
+        with open(output_path, "rb") as f:
+            st.download_button(
+                "Download results (JSONL)", f.read(),
+                file_name="batch_results.jsonl", mime="application/jsonl"
+            )
+
+
+main()
@@ -33,4 +33,64 @@ B. Expanded Context
 C. Additional Insights
 D. Potential Further Exploration
 
-Respond in a structured, clear manner."""
\ No newline at end of file
+Respond in a structured, clear manner."""
+
+CHUNK_SUMMARY_PROMPT = """You are summarizing one section of a longer YouTube video transcript.
+This section covers {time_range} of the video.
+Summarize the key points, important details and any conclusions from this section only.
+Be concise and do not speculate about the rest of the video.
+
+Transcript section: """
+
+REDUCE_SUMMARY_PROMPT = """You are a comprehensive YouTube video summarizer.
+The following are summaries of consecutive sections of a single video, in order.
+Combine them into one detailed summary of the whole video, including:
+1. Key main points
+2. Important details
+3. Context of the video
+4. Potential insights or implications
+
+Remove repetition between sections and keep the overall flow of the video.
+
+Section summaries: """
+
+
+RETRIEVAL_QUESTION_PROMPT = """You are an advanced AI assistant designed to provide comprehensive answers about a YouTube video topic.
+
+Context:
+- Relevant transcript excerpts (timestamps in brackets):
+{excerpts}
+- Conversation so far: {history}
+- User Question: {question}
+
+Task: Generate a multi-faceted response that includes:
+1. A direct answer based on the transcript excerpts, citing timestamps where useful
+2. Additional contextual information from broader knowledge
+3. Relevant insights, background, or related information
+4. Potential follow-up areas of exploration
+
+Guidelines:
+- Use the transcript excerpts as the primary reference
+- Expand beyond the excerpts with credible, relevant information
+- If the excerpts lack sufficient information, clearly indicate this
+- Ensure the response is coherent, informative, and engaging
+
+Response Format:
+A. Direct Video Response
+B. Expanded Context
+C. Additional Insights
+D. Potential Further Exploration
+
+Respond in a structured, clear manner in the {language} language."""
+
+
+CHAT_HISTORY_SUMMARY_PROMPT = """Update the running summary of a conversation about a YouTube video.
+Keep the user's questions, the key facts given in answers and any preferences the user stated.
+Write at most 150 words.
+
+Current summary: {summary}
+
+New turns to fold in:
+{turns}
+
+Updated summary:"""
@@ -0,0 +1,165 @@
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from chunking import chunk_segments, format_timestamp
+from transcripts import get_transcript
+
+RETRIEVAL_CHUNK_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_TOKENS", 250))
+RETRIEVAL_CHUNK_OVERLAP_TOKENS = int(os.getenv("RETRIEVAL_CHUNK_OVERLAP_TOKENS", 40))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 5))
+# Approximate bytes of built indexes kept for reuse across questions and sessions
+RETRIEVAL_CACHE_BYTES = int(os.getenv("RETRIEVAL_CACHE_BYTES", 64 * 1024 * 1024))
+
+# Standard BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        list: Tokens
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class TranscriptIndex:
+    """
+    BM25 index over overlapping transcript chunks, with per-chunk term weights
+    precomputed into postings lists so a query only touches the chunks containing its terms
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.vocabulary = {}
+        terms, documents, counts = [], [], []
+        for document, chunk in enumerate(chunks):
+            chunk_counts = {}
+            for token in tokenize(chunk["text"]):
+                term_id = self.vocabulary.setdefault(token, len(self.vocabulary))
+                chunk_counts[term_id] = chunk_counts.get(term_id, 0) + 1
+            terms.extend(chunk_counts.keys())
+            documents.extend([document] * len(chunk_counts))
+            counts.extend(chunk_counts.values())
+
+        terms = np.array(terms, dtype=np.int32)
+        documents = np.array(documents, dtype=np.int32)
+        tf = np.array(counts, dtype=np.float32)
+
+        lengths = np.bincount(documents, weights=tf, minlength=len(chunks))
+        average_length = max(float(lengths.mean()), 1.0) if len(chunks) else 1.0
+        document_frequency = np.bincount(terms, minlength=len(self.vocabulary))
+        idf = np.log1p((len(chunks) - document_frequency + 0.5) / (document_frequency + 0.5))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[documents] / average_length)
+        weights = idf[terms] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        # Postings grouped by term: the entries of term t are offsets[t]:offsets[t + 1]
+        order = np.argsort(terms, kind="stable")
+        self.postings_documents = documents[order]
+        self.postings_weights = weights[order].astype(np.float32)
+        self.offsets = np.concatenate(([0], np.cumsum(document_frequency)))
+
+    def search(self, query, top_k=RETRIEVAL_TOP_K):
+        """
+        Find the chunks most relevant to a query
+
+        Args:
+            query (str): User question
+            top_k (int): Maximum number of chunks to return
+
+        Returns:
+            list: Matching chunks in video order
+        """
+        term_ids = [self.vocabulary[token] for token in set(tokenize(query)) if token in self.vocabulary]
+        if not term_ids or not self.chunks:
+            return []
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            # A chunk appears at most once in a term's postings, so plain indexing adds correctly
+            scores[self.postings_documents[start:end]] += self.postings_weights[start:end]
+        top_k = min(top_k, len(self.chunks))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = [index for index in best if scores[index] > 0]
+        return [self.chunks[index] for index in sorted(best)]
+
+    def memory_bytes(self):
+        """
+        Approximate the memory held by the index, including its chunk texts
+
+        Returns:
+            int: Size in bytes
+        """
+        arrays = self.postings_documents.nbytes + self.postings_weights.nbytes + self.offsets.nbytes
+        vocabulary = sys.getsizeof(self.vocabulary) + sum(sys.getsizeof(token) for token in self.vocabulary)
+        texts = sum(sys.getsizeof(chunk["text"]) for chunk in self.chunks)
+        return arrays + vocabulary + texts
+
+
+_indexes = OrderedDict()
+_indexes_bytes = 0
+_indexes_lock = threading.Lock()
+
+
+def get_transcript_index(video_id, language_code='en'):
+    """
+    Build, or reuse, the retrieval index for a video's transcript
+
+    Built indexes are kept in least-recently-used order until they add up to
+    RETRIEVAL_CACHE_BYTES; the most recent one is always kept.
+
+    Args:
+        video_id (str): YouTube video ID
+        language_code (str): Transcript language
+
+    Returns:
+        TranscriptIndex: Index over transcript chunks
+    """
+    global _indexes_bytes
+    key = (video_id, language_code)
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key][0]
+
+    transcript = get_transcript(video_id, language_code)
+    chunks = chunk_segments(
+        transcript.segments(), RETRIEVAL_CHUNK_TOKENS, RETRIEVAL_CHUNK_OVERLAP_TOKENS
+    )
+    index = TranscriptIndex(chunks)
+    size = index.memory_bytes()
+
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key][0]
+        _indexes[key] = (index, size)
+        _indexes_bytes += size
+        while _indexes_bytes > RETRIEVAL_CACHE_BYTES and len(_indexes) > 1:
+            _indexes_bytes -= _indexes.popitem(last=False)[1][1]
+    return index
+
+
+def format_excerpts(chunks):
+    """
+    Format retrieved chunks for a prompt, each prefixed with its timestamp
+
+    Args:
+        chunks (list): Chunks from TranscriptIndex.search()
+
+    Returns:
+        str: Excerpts separated by blank lines
+    """
+    return "\n\n".join(f"[{format_timestamp(chunk['start'])}] {chunk['text']}" for chunk in chunks)
@@ -0,0 +1,254 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import weakref
+
+import metrics
+from summary_cache import CACHE_DIR
+
+# Bytes of chat history a session keeps in RAM before older messages go to disk
+SESSION_MEMORY_BUDGET = int(os.getenv("SESSION_MEMORY_BUDGET", 2 * 1024 * 1024))
+# Bytes of chat history all sessions in the process keep in RAM together
+GLOBAL_SESSION_MEMORY_BUDGET = int(os.getenv("GLOBAL_SESSION_MEMORY_BUDGET", 256 * 1024 * 1024))
+# Most recent messages that always stay in RAM, at least one page of the chat
+MIN_RESIDENT_MESSAGES = 10
+SESSION_SPILL_PATH = os.path.join(CACHE_DIR, "sessions.db")
+# Spilled messages of sessions that ended are deleted after this long
+SESSION_SPILL_RETENTION = 24 * 60 * 60
+
+_db_lock = threading.Lock()
+_db_initialized = False
+# Every live history, so the global budget can spill from whichever session is largest
+_histories = weakref.WeakValueDictionary()
+_registry_lock = threading.Lock()
+
+
+def _execute(sql, params=(), fetch=False):
+    # Short-lived connection so histories can be used from any session thread
+    global _db_initialized
+    with _db_lock:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(SESSION_SPILL_PATH, timeout=10)
+        try:
+            if not _db_initialized:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS spilled_messages (
+                        session_id TEXT NOT NULL,
+                        seq INTEGER NOT NULL,
+                        message TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (session_id, seq)
+                    )"""
+                )
+                conn.execute(
+                    "DELETE FROM spilled_messages WHERE created_at < ?",
+                    (time.time() - SESSION_SPILL_RETENTION,)
+                )
+                _db_initialized = True
+            if isinstance(params, list):
+                conn.executemany(sql, params)
+                rows = None
+            else:
+                rows = conn.execute(sql, params).fetchall() if fetch else None
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+
+
+def size_of(value):
+    """
+    Approximate the memory held by a session-state value, following containers
+
+    Args:
+        value: Any value stored in session state
+
+    Returns:
+        int: Size in bytes
+    """
+    if hasattr(value, "memory_bytes"):
+        return value.memory_bytes()
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(size_of(key) + size_of(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(size_of(item) for item in value)
+    return size
+
+
+class ChatHistory:
+    """
+    List-like chat history that keeps recent messages in RAM and spills older
+    ones to SQLite, loading them back only when they are displayed
+    """
+
+    def __init__(self, session_id=None, budget=SESSION_MEMORY_BUDGET):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.budget = budget
+        self._resident = []
+        self._spilled = 0
+        self._bytes = 0
+        self._lock = threading.RLock()
+        with _registry_lock:
+            _histories[self.session_id] = self
+
+    def __len__(self):
+        with self._lock:
+            return self._spilled + len(self._resident)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        with self._lock:
+            if not isinstance(index, slice):
+                if index < 0:
+                    index += len(self)
+                return self[index:index + 1][0]
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self[start:stop][::step]
+            messages = []
+            if start < self._spilled:
+                rows = _execute(
+                    """SELECT message FROM spilled_messages
+                    WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq""",
+                    (self.session_id, start, min(stop, self._spilled)),
+                    fetch=True
+                )
+                messages = [json.loads(row[0]) for row in rows]
+            return messages + self._resident[max(0, start - self._spilled):max(0, stop - self._spilled)]
+
+    def append(self, message):
+        """
+        Add a message, spilling older ones if the session or process budget is exceeded
+
+        Args:
+            message (dict): JSON-serializable message
+        """
+        with self._lock:
+            self._resident.append(message)
+            self._bytes += size_of(message)
+            if self._bytes > self.budget:
+                self.spill(self.budget)
+        enforce_global_budget()
+
+    def clear(self):
+        """
+        Remove every message, in memory and on disk
+        """
+        with self._lock:
+            if self._spilled:
+                _execute("DELETE FROM spilled_messages WHERE session_id = ?", (self.session_id,))
+            self._resident = []
+            self._spilled = 0
+            self._bytes = 0
+
+    def spill(self, target_bytes):
+        """
+        Move the oldest resident messages to disk until RAM use is within target_bytes
+
+        At least MIN_RESIDENT_MESSAGES stay in memory.
+
+        Args:
+            target_bytes (int): RAM budget to get under
+
+        Returns:
+            int: Bytes released
+        """
+        with self._lock:
+            count = 0
+            released = 0
+            while (self._bytes - released > target_bytes
+                   and len(self._resident) - count > MIN_RESIDENT_MESSAGES):
+                released += size_of(self._resident[count])
+                count += 1
+            if not count:
+                return 0
+            now = time.time()
+            _execute(
+                "INSERT OR REPLACE INTO spilled_messages VALUES (?, ?, ?, ?)",
+                [
+                    (self.session_id, self._spilled + i, json.dumps(message, ensure_ascii=False), now)
+                    for i, message in enumerate(self._resident[:count])
+                ]
+            )
+            del self._resident[:count]
+            self._spilled += count
+            self._bytes -= released
+        metrics.increment("session_spilled_messages_total", count)
+        return released
+
+    def memory_bytes(self):
+        """
+        Bytes of messages currently held in RAM
+
+        Returns:
+            int: Approximate size
+        """
+        with self._lock:
+            return self._bytes
+
+    def stats(self):
+        """
+        Report where the history is held
+
+        Returns:
+            dict: "resident" and "spilled" message counts and "bytes" in RAM
+        """
+        with self._lock:
+            return {"resident": len(self._resident), "spilled": self._spilled, "bytes": self._bytes}
+
+
+def global_memory_bytes():
+    """
+    Bytes of chat history held in RAM by every live session
+
+    Returns:
+        int: Approximate size
+    """
+    with _registry_lock:
+        histories = list(_histories.values())
+    return sum(history.memory_bytes() for history in histories)
+
+
+def enforce_global_budget():
+    """
+    Spill the largest sessions first until the process is within GLOBAL_SESSION_MEMORY_BUDGET
+    """
+    with _registry_lock:
+        histories = list(_histories.values())
+    excess = sum(history.memory_bytes() for history in histories) - GLOBAL_SESSION_MEMORY_BUDGET
+    for history in sorted(histories, key=lambda h: h.memory_bytes(), reverse=True):
+        if excess <= 0:
+            break
+        excess -= history.spill(max(0, history.memory_bytes() - excess))
+
+
+def memory_report(session_state):
+    """
+    Describe how much memory a session holds, largest entries first
+
+    Args:
+        session_state: Mapping of session-state keys to values
+
+    Returns:
+        str: One line per entry plus session and process totals
+    """
+    sizes = sorted(
+        ((key, size_of(value)) for key, value in session_state.items()),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    lines = [f"{key:<28} {size / 1024:>9.1f} KB" for key, size in sizes]
+    for key, value in session_state.items():
+        if isinstance(value, ChatHistory):
+            stats = value.stats()
+            lines.append(f"{key}: {stats['resident']} messages in memory, {stats['spilled']} on disk")
+    lines.append(f"{'session total':<28} {sum(size for _, size in sizes) / 1024:>9.1f} KB")
+    lines.append(f"{'all chat histories':<28} {global_memory_bytes() / 1024:>9.1f} KB")
+    return "\n".join(lines)
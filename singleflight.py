@@ -0,0 +1,70 @@
+import threading
+
+import metrics
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one: the first caller does
+    the work and every caller arriving while it runs shares its result
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key (hashable): Identifies the work, e.g. a summary cache key
+            fn (callable): Function doing the work
+
+        Returns:
+            tuple: (result, shared) where shared is True if another caller did the work
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is None:
+                metrics.increment("singleflight_total", flight=self.name, result="shared")
+                return call.result, True
+            if isinstance(call.error, Exception):
+                raise call.error
+            # The leader was interrupted (e.g. its Streamlit script was stopped
+            # or rerun), which says nothing about this caller: do the work here
+            return self.do(key, fn)
+
+        metrics.increment("singleflight_total", flight=self.name, result="leader")
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+# Shared by every session in the process
+analysis_flight = SingleFlight("analysis")
+transcript_flight = SingleFlight("transcript")
@@ -0,0 +1,50 @@
+import llm_client
+from llm_client import GEMINI_MODEL, TASK_SUMMARY, TASK_MAP, TASK_REDUCE
+from chunking import estimate_tokens, map_reduce_summary, CHUNKING_THRESHOLD_TOKENS
+from prompts import SUMMARY_PROMPT, CHUNK_SUMMARY_PROMPT, REDUCE_SUMMARY_PROMPT
+
+
+def summarize_transcript(transcript_text, segments=None, model_name=GEMINI_MODEL, on_progress=None):
+    """
+    Summarize a transcript without any UI side effects
+
+    Long transcripts with segment data are summarized with map-reduce.
+    Errors are raised to the caller.
+
+    Args:
+        transcript_text (str): Video transcript
+        segments (list, optional): Transcript segments used for chunking
+        model_name (str): Gemini model to use, or AUTO_MODEL to route per call
+        on_progress (callable, optional): Called with the partial summary as it
+            streams in; only used for single-call summaries
+
+    Returns:
+        str: Generated summary
+
+    Raises:
+        LLMError: If the model returns no text, e.g. an aborted stream
+    """
+    summary = _summarize(transcript_text, segments, model_name, on_progress)
+    if not summary.strip():
+        raise llm_client.LLMError("The model returned an empty summary")
+    return summary
+
+
+def _summarize(transcript_text, segments, model_name, on_progress):
+    if segments and estimate_tokens(transcript_text) > CHUNKING_THRESHOLD_TOKENS:
+        # Long videos: summarize chunks in parallel, then merge the partial summaries
+        return map_reduce_summary(
+            segments,
+            lambda prompt: llm_client.generate(prompt, model_name, task=TASK_MAP),
+            CHUNK_SUMMARY_PROMPT,
+            REDUCE_SUMMARY_PROMPT,
+            reduce_generate=lambda prompt: llm_client.generate(prompt, model_name, task=TASK_REDUCE)
+        )
+    if on_progress is None:
+        return llm_client.generate(SUMMARY_PROMPT + transcript_text, model_name, task=TASK_SUMMARY)
+
+    parts = []
+    for text in llm_client.stream(SUMMARY_PROMPT + transcript_text, model_name, task=TASK_SUMMARY):
+        parts.append(text)
+        on_progress("".join(parts))
+    return "".join(parts)
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# On-disk summary cache shared by every session and process on this host
+CACHE_DIR = os.getenv(
+    "VIDEO_SUMMARIZER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+SUMMARY_CACHE_PATH = os.path.join(CACHE_DIR, "summaries.db")
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", 7 * 24 * 60 * 60))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 5000))
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    """
+    Open a connection to the cache database, creating the schema on first use
+
+    Returns:
+        sqlite3.Connection: Open database connection
+    """
+    global _initialized
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(SUMMARY_CACHE_PATH, timeout=10)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS summaries (
+                cache_key TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at)"
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def prompt_hash(prompt):
+    """
+    Hash a prompt so that editing it invalidates previously cached summaries
+
+    Args:
+        prompt (str): Prompt text
+
+    Returns:
+        str: Short hex digest of the prompt
+    """
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def make_cache_key(video_id, transcript_language, model_name, prompt):
+    """
+    Build the cache key for a summary
+
+    Args:
+        video_id (str): YouTube video ID
+        transcript_language (str): Requested transcript language code
+        model_name (str): Gemini model used for generation
+        prompt (str): Summary prompt
+
+    Returns:
+        str: Cache key
+    """
+    return "|".join([video_id, transcript_language, model_name, prompt_hash(prompt)])
+
+
+def make_variant_key(cache_key, target_language):
+    """
+    Build the cache key for a translation of a cached summary
+
+    Args:
+        cache_key (str): Key of the original summary from make_cache_key()
+        target_language (str): Language code of the translation
+
+    Returns:
+        str: Cache key
+    """
+    return f"{cache_key}|{target_language}"
+
+
+def get_cached_summary(cache_key):
+    """
+    Look up a summary, ignoring entries older than the TTL
+
+    Args:
+        cache_key (str): Key from make_cache_key()
+
+    Returns:
+        str or None: Cached summary if present and fresh
+    """
+    now = time.time()
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT summary, created_at FROM summaries WHERE cache_key = ?",
+                    (cache_key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                # Expired entries and empty ones stored by older versions count as misses
+                if now - row[1] > SUMMARY_CACHE_TTL or not row[0].strip():
+                    conn.execute("DELETE FROM summaries WHERE cache_key = ?", (cache_key,))
+                    conn.commit()
+                    return None
+                conn.execute(
+                    "UPDATE summaries SET accessed_at = ? WHERE cache_key = ?",
+                    (now, cache_key)
+                )
+                conn.commit()
+                return row[0]
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        return None
+
+
+def store_summary(cache_key, video_id, summary):
+    """
+    Save a summary and evict expired and least recently used entries
+
+    Args:
+        cache_key (str): Key from make_cache_key()
+        video_id (str): YouTube video ID
+        summary (str): Generated summary
+    """
+    # An empty summary would be served as a hit that shows nothing and never regenerates
+    if not summary or not summary.strip():
+        return
+    now = time.time()
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                    (cache_key, video_id, summary, now, now)
+                )
+                conn.execute(
+                    "DELETE FROM summaries WHERE created_at < ?",
+                    (now - SUMMARY_CACHE_TTL,)
+                )
+                conn.execute(
+                    """DELETE FROM summaries WHERE cache_key IN (
+                        SELECT cache_key FROM summaries
+                        ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (SUMMARY_CACHE_MAX_ENTRIES,)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def clear_summary_cache():
+    """
+    Remove every cached summary
+    """
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute("DELETE FROM summaries")
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from summary_cache import make_variant_key, get_cached_summary, store_summary
+
+# Paragraphs translated at once for a single summary
+SUMMARY_TRANSLATION_WORKERS = int(os.getenv("SUMMARY_TRANSLATION_WORKERS", 4))
+# Languages translated in the background as soon as a new summary exists,
+# e.g. SUMMARY_PREWARM_LANGUAGES=es,fr,de
+SUMMARY_PREWARM_LANGUAGES = [
+    code.strip() for code in os.getenv("SUMMARY_PREWARM_LANGUAGES", "").split(",") if code.strip()
+]
+# Stays well inside googletrans' per-request size limit
+PARAGRAPH_MAX_CHARS = 4500
+
+_PARAGRAPH_BREAK = re.compile(r"(\n\s*\n)")
+
+_paragraph_executor = ThreadPoolExecutor(
+    max_workers=SUMMARY_TRANSLATION_WORKERS, thread_name_prefix="summary-translate"
+)
+# Separate pool so background variants never wait on their own paragraph tasks
+_background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="summary-prewarm")
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+_translator = None
+
+
+def get_translator():
+    """
+    Create the googletrans translator used outside the Streamlit app
+
+    Returns:
+        googletrans.Translator: Shared translator instance
+    """
+    global _translator
+    if _translator is None:
+        from googletrans import Translator
+
+        _translator = Translator()
+    return _translator
+
+
+def split_paragraphs(text, max_chars=PARAGRAPH_MAX_CHARS):
+    """
+    Split text into paragraphs and the blank-line separators between them
+
+    Paragraphs longer than max_chars are packed line by line into smaller
+    pieces, and single lines longer than that are cut.
+
+    Args:
+        text (str): Text to split
+        max_chars (int): Largest piece sent to the translator
+
+    Returns:
+        list: Pieces that join back into the original text
+    """
+    pieces = []
+    for part in _PARAGRAPH_BREAK.split(text):
+        if len(part) <= max_chars:
+            pieces.append(part)
+            continue
+        current = ""
+        for line in part.splitlines(keepends=True):
+            while len(line) > max_chars:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(line[:max_chars])
+                line = line[max_chars:]
+            if len(current) + len(line) > max_chars:
+                pieces.append(current)
+                current = ""
+            current += line
+        if current:
+            pieces.append(current)
+    return pieces
+
+
+def translate_paragraphs(text, target_language, translator):
+    """
+    Translate text paragraph by paragraph, in parallel
+
+    Args:
+        text (str): Text to translate
+        target_language (str): Language code
+        translator (googletrans.Translator): Translator instance
+
+    Returns:
+        str: Translated text with the original paragraph breaks
+    """
+    pieces = split_paragraphs(text)
+    indexes = [i for i, piece in enumerate(pieces) if piece.strip()]
+
+    def translate(piece):
+        return translator.translate(piece, dest=target_language).text
+
+    translated = _paragraph_executor.map(translate, [pieces[i] for i in indexes])
+    for i, piece in zip(indexes, translated):
+        pieces[i] = piece
+    return "".join(pieces)
+
+
+def get_summary_variant(cache_key, video_id, summary, target_language, translator):
+    """
+    Return a summary in the target language, translating and storing it on first request
+
+    Args:
+        cache_key (str): Key of the original summary from make_cache_key()
+        video_id (str): YouTube video ID
+        summary (str): Original summary
+        target_language (str): Language code
+        translator (googletrans.Translator): Translator instance
+
+    Returns:
+        str: Translated summary
+
+    Raises:
+        Exception: If the translator fails; nothing is stored in that case
+    """
+    if target_language == "en":
+        return summary
+
+    variant_key = make_variant_key(cache_key, target_language)
+    variant = get_cached_summary(variant_key)
+    metrics.increment("cache_requests_total", cache="summary_variant",
+                      result="miss" if variant is None else "hit")
+    if variant is not None:
+        return variant
+
+    with metrics.stage("translate.summary", language=target_language):
+        variant = translate_paragraphs(summary, target_language, translator)
+    store_summary(variant_key, video_id, variant)
+    return variant
+
+
+def prewarm_summary_variants(cache_key, video_id, summary, languages=None, translator=None):
+    """
+    Translate a summary into several languages in the background
+
+    Languages already being translated for this summary are skipped; failures
+    are dropped and the variant is translated again on first request.
+
+    Args:
+        cache_key (str): Key of the original summary from make_cache_key()
+        video_id (str): YouTube video ID
+        summary (str): Original summary
+        languages (list, optional): Language codes, SUMMARY_PREWARM_LANGUAGES by default
+        translator (googletrans.Translator, optional): Translator instance
+    """
+    languages = SUMMARY_PREWARM_LANGUAGES if languages is None else languages
+    for language in languages:
+        if language == "en":
+            continue
+        variant_key = make_variant_key(cache_key, language)
+        with _in_flight_lock:
+            if variant_key in _in_flight:
+                continue
+            _in_flight.add(variant_key)
+
+        def run(language=language, variant_key=variant_key):
+            try:
+                get_summary_variant(
+                    cache_key, video_id, summary, language, translator or get_translator()
+                )
+            except Exception:
+                metrics.increment("errors_total", stage="translate.summary")
+            finally:
+                with _in_flight_lock:
+                    _in_flight.discard(variant_key)
+
+        _background_executor.submit(run)
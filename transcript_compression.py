@@ -0,0 +1,180 @@
+import os
+import re
+
+import numpy as np
+
+import metrics
+from chunking import estimate_tokens
+from language_detect import STOPWORDS
+from retrieval import tokenize
+from transcripts import join_segments
+
+# When set, the lowest-ranked segments are dropped until the transcript fits
+TRANSCRIPT_TOKEN_BUDGET = int(os.getenv("TRANSCRIPT_TOKEN_BUDGET", 0))
+# Segments whose word shingles overlap a recent segment this much are dropped
+DUPLICATE_SIMILARITY = 0.8
+# How many earlier kept segments each segment is compared against
+DUPLICATE_WINDOW = 12
+SHINGLE_SIZE = 3
+# Segments with fewer shingles than this are too short for a meaningful similarity
+MIN_SHINGLES = 3
+# Shortest and longest caption overlap stripped from the start of a segment; a
+# single shared word is as likely to be a real repetition as a rolling caption
+MIN_OVERLAP_WORDS = 2
+MAX_OVERLAP_WORDS = 20
+
+# Caption annotations such as [Music], [Applause], (laughs) and music notes
+_MARKERS = re.compile(
+    r"\[[^\]]*\]|\((?:[^)]*\b(?:music|applause|laughter|laughs|laughing|inaudible|silence)\b[^)]*)\)"
+    r"|[♪♫]+|>>",
+    re.IGNORECASE
+)
+_FILLERS = re.compile(r"\b(?:u+m+|u+h+|uhm+|e+r+m+|h+m+|m+h*m+|a+h+)\b[,.]?", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_ALL_STOPWORDS = set().union(*STOPWORDS.values())
+
+
+def clean_text(text):
+    """
+    Remove caption markers and filler words from a caption line
+
+    Args:
+        text (str): Caption text
+
+    Returns:
+        str: Cleaned text, possibly empty
+    """
+    text = _FILLERS.sub(" ", _MARKERS.sub(" ", text))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _overlap_size(previous_words, words):
+    # Rolling captions repeat the tail of the previous line at the start of the next;
+    # both word lists are already lowercased
+    for size in range(min(len(previous_words), len(words), MAX_OVERLAP_WORDS), MIN_OVERLAP_WORDS - 1, -1):
+        if previous_words[-size:] == words[:size]:
+            return size
+    return 0
+
+
+def _shingles(words):
+    # Set of word shingles, compared exactly so short segments cannot collide
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def deduplicate(segments):
+    """
+    Drop exact repeats of any earlier segment and near-repeats of recently kept ones
+
+    Only segments with at least MIN_SHINGLES shingles are candidates; short
+    replies such as "No." are kept wherever they occur.
+
+    Args:
+        segments (list): Cleaned transcript segments
+
+    Returns:
+        list: Segments in their original order
+    """
+    kept = []
+    seen = set()
+    window = []
+    for segment in segments:
+        words = tokenize(segment["text"])
+        shingles = _shingles(words)
+        # Short segments ("No.", "Yes.") repeat legitimately and carry meaning; keep them all
+        if len(shingles) >= MIN_SHINGLES:
+            # Identical normalized text anywhere in the video: keep only the first occurrence
+            normalized = " ".join(words)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            if any(
+                len(shingles & other) / len(shingles | other) >= DUPLICATE_SIMILARITY
+                for other in window
+            ):
+                continue
+            window = (window + [shingles])[-DUPLICATE_WINDOW:]
+        kept.append(segment)
+    return kept
+
+
+def trim_to_budget(segments, token_budget):
+    """
+    Keep the highest-ranked segments that fit the token budget, in their original order
+
+    Segments are ranked by how often their content words occur across the
+    transcript, a classic extractive-summary score that favours recurring topics.
+
+    Args:
+        segments (list): Transcript segments
+        token_budget (int): Maximum estimated tokens
+
+    Returns:
+        list: Selected segments
+    """
+    costs = np.array([estimate_tokens(segment["text"]) + 1 for segment in segments])
+    if costs.sum() <= token_budget:
+        return segments
+
+    words, owners = [], []
+    for index, segment in enumerate(segments):
+        for word in tokenize(segment["text"]):
+            if word not in _ALL_STOPWORDS and len(word) > 2:
+                words.append(word)
+                owners.append(index)
+
+    scores = np.zeros(len(segments))
+    if words:
+        _, inverse = np.unique(words, return_inverse=True)
+        frequencies = np.bincount(inverse)
+        weights = frequencies[inverse] / frequencies.max()
+        scores = np.bincount(owners, weights=weights, minlength=len(segments))
+    # Normalize by length so long segments do not win on size alone
+    scores = scores / np.sqrt(np.maximum(costs, 1))
+
+    order = np.argsort(-scores, kind="stable")
+    selected = order[np.cumsum(costs[order]) <= token_budget]
+    return [segments[index] for index in np.sort(selected)]
+
+
+def compress_segments(segments, token_budget=TRANSCRIPT_TOKEN_BUDGET):
+    """
+    Clean, deduplicate and optionally trim transcript segments before summarization
+
+    Args:
+        segments (list): Transcript segments with "text", "start" and "duration"
+        token_budget (int): Trim to this many estimated tokens; 0 disables trimming
+
+    Returns:
+        tuple: (text, segments, report) where report has "tokens_before",
+            "tokens_after", "segments_before" and "segments_after"
+    """
+    tokens_before = estimate_tokens(join_segments(segments))
+
+    cleaned = []
+    previous_words = []
+    for segment in segments:
+        words = clean_text(segment["text"]).split()
+        lowered = [word.lower() for word in words]
+        new_words = words[_overlap_size(previous_words, lowered):]
+        previous_words = lowered or previous_words
+        if new_words:
+            cleaned.append({**segment, "text": " ".join(new_words)})
+
+    with metrics.stage("transcript.compress", segments=len(segments)):
+        compressed = deduplicate(cleaned)
+        if token_budget:
+            compressed = trim_to_budget(compressed, token_budget)
+    # A transcript of nothing but markers is still better than an empty prompt
+    compressed = compressed or segments
+
+    text = join_segments(compressed)
+    report = {
+        "tokens_before": tokens_before,
+        "tokens_after": estimate_tokens(text),
+        "segments_before": len(segments),
+        "segments_after": len(compressed),
+    }
+    metrics.increment("transcript_tokens_total", report["tokens_before"], state="raw")
+    metrics.increment("transcript_tokens_total", report["tokens_after"], state="compressed")
+    return text, compressed, report
@@ -0,0 +1,266 @@
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from summary_cache import CACHE_DIR
+
+TRANSCRIPT_STORE_PATH = os.path.join(CACHE_DIR, "transcripts.db")
+TRANSCRIPT_STORE_TTL = int(os.getenv("TRANSCRIPT_STORE_TTL", 30 * 24 * 60 * 60))
+# Caption tracks can be added to a video later, so the language index expires sooner
+TRANSCRIPT_INDEX_TTL = int(os.getenv("TRANSCRIPT_INDEX_TTL", 24 * 60 * 60))
+
+_lock = threading.Lock()
+_initialized = False
+
+
+class StoredTranscript:
+    """
+    Transcript kept as one text blob plus parallel arrays of segment
+    character offsets, start times and durations
+    """
+
+    __slots__ = ("text", "offsets", "starts", "durations", "source", "track")
+
+    def __init__(self, text, offsets, starts, durations, source, track=None):
+        self.text = text
+        self.offsets = offsets
+        self.starts = starts
+        self.durations = durations
+        self.source = source
+        self.track = track
+
+    def resolved(self, source, track):
+        """
+        Share this transcript's data under another language resolution
+
+        Args:
+            source (str): How the requested language was resolved
+            track (str): Caption track the text came from
+
+        Returns:
+            StoredTranscript: Copy sharing the text and arrays
+        """
+        return StoredTranscript(self.text, self.offsets, self.starts, self.durations, source, track)
+
+    @classmethod
+    def from_segments(cls, segments, source):
+        """
+        Build a stored transcript from fetched segments
+
+        Args:
+            segments (list): Segments with "text", "start" and "duration"
+            source (str): How the transcript language was resolved
+
+        Returns:
+            StoredTranscript: Compact transcript
+        """
+        offsets = array("I")
+        starts = array("d")
+        durations = array("f")
+        parts = []
+        position = 0
+        for item in segments:
+            offsets.append(position)
+            starts.append(float(item.get("start", 0.0)))
+            durations.append(float(item.get("duration", 0.0)))
+            parts.append(item["text"])
+            position += len(item["text"]) + 1
+        return cls(" ".join(parts), offsets, starts, durations, source)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def segment_text(self, index):
+        """
+        Text of a single segment
+
+        Args:
+            index (int): Segment index
+
+        Returns:
+            str: Segment text
+        """
+        end = self.offsets[index + 1] - 1 if index + 1 < len(self.offsets) else len(self.text)
+        return self.text[self.offsets[index]:end]
+
+    def segments(self):
+        """
+        Rebuild the segment dicts returned by the transcript API
+
+        Returns:
+            list: Dicts with "text", "start" and "duration"
+        """
+        return [
+            {"text": self.segment_text(i), "start": self.starts[i], "duration": self.durations[i]}
+            for i in range(len(self.offsets))
+        ]
+
+    def time_at(self, char_offset):
+        """
+        Find the video position of a character offset in the text
+
+        Args:
+            char_offset (int): Offset into self.text
+
+        Returns:
+            float: Start time in seconds of the segment containing the offset
+        """
+        if not self.offsets:
+            return 0.0
+        index = max(0, bisect.bisect_right(self.offsets, char_offset) - 1)
+        return self.starts[index]
+
+
+def _connect():
+    global _initialized
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(TRANSCRIPT_STORE_PATH, timeout=10)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                source TEXT NOT NULL,
+                text TEXT NOT NULL,
+                offsets BLOB NOT NULL,
+                starts BLOB NOT NULL,
+                durations BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (video_id, language)
+            )"""
+        )
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS availability (
+                video_id TEXT PRIMARY KEY,
+                tracks TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def load_transcript(video_id, language_code):
+    """
+    Read a transcript from the local store
+
+    Args:
+        video_id (str): YouTube video ID
+        language_code (str): Caption track key
+
+    Returns:
+        StoredTranscript or None: Stored transcript if present and fresh
+    """
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    """SELECT source, text, offsets, starts, durations, created_at
+                    FROM transcripts WHERE video_id = ? AND language = ?""",
+                    (video_id, language_code)
+                ).fetchone()
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        return None
+
+    if row is None or time.time() - row[5] > TRANSCRIPT_STORE_TTL:
+        return None
+    source, text, offsets_blob, starts_blob, durations_blob, _ = row
+    offsets = array("I")
+    offsets.frombytes(offsets_blob)
+    starts = array("d")
+    starts.frombytes(starts_blob)
+    durations = array("f")
+    durations.frombytes(durations_blob)
+    return StoredTranscript(text, offsets, starts, durations, source)
+
+
+def save_transcript(video_id, language_code, transcript):
+    """
+    Write a transcript to the local store
+
+    Args:
+        video_id (str): YouTube video ID
+        language_code (str): Caption track key
+        transcript (StoredTranscript): Transcript to store
+    """
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        video_id,
+                        language_code,
+                        transcript.source,
+                        transcript.text,
+                        transcript.offsets.tobytes(),
+                        transcript.starts.tobytes(),
+                        transcript.durations.tobytes(),
+                        time.time(),
+                    )
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def load_availability(video_id):
+    """
+    Read the cached index of caption tracks available for a video
+
+    Args:
+        video_id (str): YouTube video ID
+
+    Returns:
+        dict or None: Index if present and fresh
+    """
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT tracks, created_at FROM availability WHERE video_id = ?", (video_id,)
+                ).fetchone()
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        return None
+
+    if row is None or time.time() - row[1] > TRANSCRIPT_INDEX_TTL:
+        return None
+    return json.loads(row[0])
+
+
+def save_availability(video_id, index):
+    """
+    Cache the index of caption tracks available for a video
+
+    Args:
+        video_id (str): YouTube video ID
+        index (dict): Index built by transcripts.build_availability()
+    """
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO availability VALUES (?, ?, ?)",
+                    (video_id, json.dumps(index), time.time())
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,290 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_transcript_api import YouTubeTranscriptApi
+from transcript_store import (
+    StoredTranscript, load_transcript, save_transcript, load_availability, save_availability
+)
+from singleflight import transcript_flight
+import metrics
+
+# How the transcript language was resolved
+SOURCE_NATIVE = "native"
+SOURCE_TRANSLATED = "translated"
+SOURCE_FALLBACK = "fallback"
+
+# Background transcript fetches started before the user asks for an analysis
+PREFETCH_WORKERS = int(os.getenv("TRANSCRIPT_PREFETCH_WORKERS", 2))
+# Recently prefetched videos, remembered so reruns do not queue them again
+PREFETCH_MEMORY = 1024
+
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=PREFETCH_WORKERS, thread_name_prefix="transcript-prefetch"
+)
+_prefetched = OrderedDict()
+_prefetch_lock = threading.Lock()
+
+# Track listings hold the caption URLs needed to fetch; they are reused for a
+# short while so switching languages right after an analysis costs one fetch
+TRANSCRIPT_LIST_TTL = 10 * 60
+TRANSCRIPT_LIST_MEMORY = 64
+
+_recent_lists = OrderedDict()
+_recent_lists_lock = threading.Lock()
+
+
+def build_availability(transcript_list):
+    """
+    Index the caption tracks of a video
+
+    Args:
+        transcript_list (TranscriptList): Result of YouTubeTranscriptApi.list_transcripts()
+
+    Returns:
+        dict: "manual" and "generated" language codes in YouTube's order, and
+            "translation_targets", the languages the English auto-generated
+            track can be translated to
+    """
+    index = {"manual": [], "generated": [], "translation_targets": []}
+    for transcript in transcript_list:
+        kind = "generated" if transcript.is_generated else "manual"
+        index[kind].append(transcript.language_code)
+        if transcript.is_generated and transcript.language_code == "en":
+            index["translation_targets"] = [
+                language["language_code"] for language in transcript.translation_languages
+            ]
+    return index
+
+
+def resolve_track(index, language_code='en'):
+    """
+    Decide which caption track serves a language: a native track (manual before
+    auto-generated), then YouTube's translation of the English auto-generated
+    track, then the first track of the video
+
+    Args:
+        index (dict): Index from build_availability()
+        language_code (str): Preferred transcript language
+
+    Returns:
+        tuple: (source, track) where source is SOURCE_NATIVE, SOURCE_TRANSLATED or
+            SOURCE_FALLBACK and track is a key such as "manual:es", "generated:en"
+            or "generated:en>es"
+
+    Raises:
+        LookupError: If the video has no captions at all
+    """
+    if language_code in index["manual"]:
+        return SOURCE_NATIVE, f"manual:{language_code}"
+    if language_code in index["generated"]:
+        return SOURCE_NATIVE, f"generated:{language_code}"
+    if "en" in index["generated"] and language_code in index["translation_targets"]:
+        return SOURCE_TRANSLATED, f"generated:en>{language_code}"
+    if index["manual"]:
+        return SOURCE_FALLBACK, f"manual:{index['manual'][0]}"
+    if index["generated"]:
+        return SOURCE_FALLBACK, f"generated:{index['generated'][0]}"
+    raise LookupError("No transcripts are available for this video")
+
+
+def parse_track(track):
+    """
+    Split a track key from resolve_track()
+
+    Args:
+        track (str): Track key
+
+    Returns:
+        tuple: (kind, language_code, translated_to) where kind is "manual" or
+            "generated" and translated_to is None for untranslated tracks
+    """
+    kind, _, languages = track.partition(":")
+    language_code, _, translated_to = languages.partition(">")
+    return kind, language_code, translated_to or None
+
+
+def list_availability(video_id):
+    """
+    List the caption tracks of a video, caching the index
+
+    Args:
+        video_id (str): YouTube video ID
+
+    Returns:
+        tuple: (index, transcript_list)
+    """
+    with metrics.stage("transcript.list"):
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+    index = build_availability(transcript_list)
+    save_availability(video_id, index)
+    with _recent_lists_lock:
+        _recent_lists[video_id] = (time.monotonic(), transcript_list)
+        _recent_lists.move_to_end(video_id)
+        while len(_recent_lists) > TRANSCRIPT_LIST_MEMORY:
+            _recent_lists.popitem(last=False)
+    return index, transcript_list
+
+
+def _get_transcript_list(video_id):
+    with _recent_lists_lock:
+        listed_at, transcript_list = _recent_lists.get(video_id, (0.0, None))
+    if transcript_list is not None and time.monotonic() - listed_at < TRANSCRIPT_LIST_TTL:
+        return transcript_list
+    return list_availability(video_id)[1]
+
+
+def get_availability(video_id):
+    """
+    Get the caption track index of a video, from the cache when fresh
+
+    Args:
+        video_id (str): YouTube video ID
+
+    Returns:
+        dict: Index from build_availability()
+    """
+    index = load_availability(video_id)
+    metrics.increment("cache_requests_total", cache="transcript_index",
+                      result="miss" if index is None else "hit")
+    return index if index is not None else list_availability(video_id)[0]
+
+
+def fetch_track(transcript_list, track):
+    """
+    Fetch the segments of one caption track
+
+    Args:
+        transcript_list (TranscriptList): Listing of the video's tracks
+        track (str): Track key from resolve_track()
+
+    Returns:
+        list: Dicts with "text", "start" and "duration"
+    """
+    kind, language_code, translated_to = parse_track(track)
+    if kind == "manual":
+        transcript = transcript_list.find_manually_created_transcript([language_code])
+    else:
+        transcript = transcript_list.find_generated_transcript([language_code])
+    if translated_to:
+        transcript = transcript.translate(translated_to)
+    with metrics.stage("transcript.fetch", track=track):
+        return transcript.fetch()
+
+
+def join_segments(segments):
+    """
+    Join transcript segments into plain text
+
+    Args:
+        segments (list): Transcript segments
+
+    Returns:
+        str: Transcript text
+    """
+    return " ".join([item["text"] for item in segments])
+
+
+def get_transcript(video_id, language_code='en'):
+    """
+    Get a transcript from the local store, fetching and storing it on a miss
+
+    The caption track is chosen from the cached availability index, and
+    transcripts are stored per track, so languages that resolve to an
+    already stored track cost no network calls at all.
+
+    Args:
+        video_id (str): YouTube video ID
+        language_code (str): Preferred transcript language
+
+    Returns:
+        StoredTranscript: Transcript with segment timestamps, its resolution
+            in "source" and the caption track key in "track"
+    """
+    source, track = resolve_track(get_availability(video_id), language_code)
+    transcript = load_transcript(video_id, track)
+    metrics.increment("cache_requests_total", cache="transcript",
+                      result="miss" if transcript is None else "hit")
+    if transcript is None:
+        def fetch():
+            # A prefetch may have stored the track between the miss above and this flight
+            stored = load_transcript(video_id, track)
+            if stored is not None:
+                return stored
+            transcript_list = _get_transcript_list(video_id)
+            fetched = StoredTranscript.from_segments(fetch_track(transcript_list, track), source)
+            save_transcript(video_id, track, fetched)
+            return fetched
+
+        # An analysis started while a prefetch is running waits for it instead of refetching
+        transcript = transcript_flight.do(f"{video_id}|{track}", fetch)[0]
+    return transcript.resolved(source, track)
+
+
+def cached_resolution(video_id, language_code='en'):
+    """
+    Resolve a language against the cached index only, without network calls
+
+    Args:
+        video_id (str): YouTube video ID
+        language_code (str): Preferred transcript language
+
+    Returns:
+        tuple or None: (source, track) as from resolve_track(), or None if the
+            video's tracks are not indexed or it has none
+    """
+    index = load_availability(video_id)
+    if index is None:
+        return None
+    try:
+        return resolve_track(index, language_code)
+    except LookupError:
+        return None
+
+
+def describe_track(track):
+    """
+    Describe a caption track for display, e.g. "en (auto-generated) -> es"
+
+    Args:
+        track (str): Track key from resolve_track()
+
+    Returns:
+        str: Short description
+    """
+    kind, language_code, translated_to = parse_track(track)
+    description = f"{language_code} ({'auto-generated' if kind == 'generated' else 'manual'})"
+    return f"{description} -> {translated_to}" if translated_to else description
+
+
+def prefetch_transcript(video_id, language_code='en'):
+    """
+    Start fetching a transcript into the local store in the background
+
+    Each video and language is queued at most once while it stays among the
+    recently prefetched. Failures are not retried here; the analysis itself
+    fetches again and reports the error.
+
+    Args:
+        video_id (str): YouTube video ID
+        language_code (str): Preferred transcript language
+    """
+    key = (video_id, language_code)
+    with _prefetch_lock:
+        if key in _prefetched:
+            _prefetched.move_to_end(key)
+            return
+        _prefetched[key] = True
+        while len(_prefetched) > PREFETCH_MEMORY:
+            _prefetched.popitem(last=False)
+
+    def run():
+        try:
+            get_transcript(video_id, language_code)
+            metrics.increment("prefetch_total", result="ok")
+        except Exception:
+            metrics.increment("prefetch_total", result="error")
+
+    _prefetch_executor.submit(run)
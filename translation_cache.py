@@ -0,0 +1,202 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from summary_cache import CACHE_DIR
+import metrics
+
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", 10000))
+TRANSLATION_CACHE_MAX_BYTES = int(os.getenv("TRANSLATION_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Set TRANSLATION_CACHE_PERSIST=1 to keep translations across server restarts
+TRANSLATION_CACHE_PERSIST = os.getenv("TRANSLATION_CACHE_PERSIST", "0") == "1"
+TRANSLATION_CACHE_PATH = os.path.join(CACHE_DIR, "translations.db")
+
+
+def translation_key(text, target_language, namespace="text"):
+    """
+    Build a collision-free cache key from the full text
+
+    Args:
+        text (str): Source text
+        target_language (str): Target language code
+        namespace (str): Separates UI strings from content translations
+
+    Returns:
+        str: Cache key
+    """
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{namespace}:{target_language}:{digest}"
+
+
+class TranslationCache:
+    """
+    Thread-safe LRU cache of translations shared by every session in the process,
+    bounded by entry count and by the memory held in values, optionally backed by SQLite
+    """
+
+    def __init__(self, max_entries=TRANSLATION_CACHE_MAX_ENTRIES,
+                 max_bytes=TRANSLATION_CACHE_MAX_BYTES, path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._execute(
+                "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def _execute(self, sql, params=()):
+        # Short-lived connection so the cache can be used from any thread
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            row = conn.execute(sql, params).fetchone()
+            conn.commit()
+            return row
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """
+        Look up a translation
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str or None: Cached translation
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if value is not None:
+            metrics.increment("cache_requests_total", cache="translation", result="hit")
+            return value
+
+        if self.path:
+            try:
+                row = self._execute("SELECT value FROM translations WHERE key = ?", (key,))
+                value = row[0] if row else None
+            except sqlite3.Error:
+                value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._store(key, value)
+        metrics.increment("cache_requests_total", cache="translation",
+                          result="miss" if value is None else "hit")
+        return value
+
+    def set(self, key, value):
+        """
+        Store a translation
+
+        Args:
+            key (str): Cache key
+            value (str): Translated text
+        """
+        with self._lock:
+            self._store(key, value)
+        if self.path:
+            try:
+                self._execute("INSERT OR REPLACE INTO translations VALUES (?, ?)", (key, value))
+            except sqlite3.Error:
+                pass
+
+    def _store(self, key, value):
+        # Caller holds the lock
+        if key in self._entries:
+            self._bytes -= sys.getsizeof(self._entries[key])
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._bytes += sys.getsizeof(value)
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= sys.getsizeof(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Remove every cached translation, in memory and on disk
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.path:
+            try:
+                self._execute("DELETE FROM translations")
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        """
+        Report cache counters
+
+        Returns:
+            dict: hits, misses, evictions, current number of entries and bytes held
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Process-wide instance shared by all Streamlit sessions
+translation_cache = TranslationCache(
+    path=TRANSLATION_CACHE_PATH if TRANSLATION_CACHE_PERSIST else None
+)
+
+# Failed translations are retried here so backoff never blocks a script thread
+_retry_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="translation-retry")
+_retrying = set()
+_retrying_lock = threading.Lock()
+
+
+def retry_in_background(key, translate, max_retries=3):
+    """
+    Retry a failed translation off the request path, caching the result when it succeeds
+
+    Args:
+        key (str): Cache key the translation is stored under
+        translate (callable): Function returning the translated text
+        max_retries (int): Attempts before giving up
+    """
+    with _retrying_lock:
+        if key in _retrying:
+            return
+        _retrying.add(key)
+
+    def run():
+        try:
+            for attempt in range(max_retries):
+                time.sleep(1 * (attempt + 1))
+                try:
+                    translation_cache.set(key, translate())
+                    return
+                except Exception:
+                    metrics.increment("retries_total", stage="translate.background")
+        finally:
+            with _retrying_lock:
+                _retrying.discard(key)
+
+    _retry_executor.submit(run)
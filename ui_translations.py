@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+
+# Every static UI string shown by app.py, translated together in one request
+UI_STRINGS = [
+    "🎥 Multilingual YouTube Video Analyzer & Chatbot",
+    "Settings",
+    "Select transcript language:",
+    "Select interface language:",
+    "Clear Translation Cache",
+    "Cache cleared!",
+    "Enter YouTube Video Link:",
+    "Analyze Video",
+    "Waiting for a free analysis worker...",
+    "Fetching transcript...",
+    "Generating analysis...",
+    "Video analysis completed successfully!",
+    "📌 Comprehensive Video Analysis:",
+    "💬 Interactive Video Insights",
+    "Ask a detailed question about the video or topic",
+    "Show earlier messages",
+    "Invalid YouTube URL",
+    "Found native transcript in selected language",
+    "Using YouTube's translated transcript",
+    "Could not find transcript in selected language. Using available transcript.",
+    "Sorry, I couldn't generate a comprehensive response.",
+]
+
+# Pre-translated catalogs shipped with the app, one JSON file per language
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+
+_catalogs = {}
+
+
+def load_catalog(target_language):
+    """
+    Load the shipped translation catalog for a language
+
+    Args:
+        target_language (str): Language code
+
+    Returns:
+        dict: Mapping of English UI string to translation (empty if no catalog)
+    """
+    if target_language not in _catalogs:
+        path = os.path.join(CATALOG_DIR, f"{target_language}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                _catalogs[target_language] = json.load(f)
+        except (OSError, ValueError):
+            _catalogs[target_language] = {}
+    return _catalogs[target_language]
+
+
+def translate_batch(texts, target_language, translator):
+    """
+    Translate several short strings with a single translator round trip
+
+    The strings are sent as one newline-separated document and split back
+    apart. If the line count does not survive translation, an empty dict is
+    returned and callers fall back to per-string translation.
+
+    Args:
+        texts (list): Single-line strings to translate
+        target_language (str): Language code
+        translator (googletrans.Translator): Translator instance
+
+    Returns:
+        dict: Mapping of original string to translation
+    """
+    texts = [text for text in texts if text]
+    if not texts:
+        return {}
+    result = translator.translate("\n".join(texts), dest=target_language)
+    lines = [line.strip() for line in result.text.split("\n")]
+    if len(lines) != len(texts):
+        return {}
+    return dict(zip(texts, lines))
+
+
+def build_catalogs(language_codes):
+    """
+    Write catalog files for the given languages using the online translator
+
+    Args:
+        language_codes (list): Language codes to build
+    """
+    from googletrans import Translator
+
+    translator = Translator()
+    os.makedirs(CATALOG_DIR, exist_ok=True)
+    for code in language_codes:
+        catalog = translate_batch(UI_STRINGS, code, translator)
+        missing = [text for text in UI_STRINGS if text not in catalog]
+        for text in missing:
+            catalog[text] = translator.translate(text, dest=code).text
+        with open(os.path.join(CATALOG_DIR, f"{code}.json"), "w", encoding="utf-8") as f:
+            json.dump(catalog, f, ensure_ascii=False, indent=2)
+        print(f"Wrote {code}.json ({len(catalog)} strings)")
+
+
+if __name__ == "__main__":
+    build_catalogs(sys.argv[1:])